@@ -0,0 +1,118 @@
+'''
+Benchmark of convex merge(get_convexes) against the former all-pairs restart loop.
+
+Hit boxes of world static tile layers of tiled/test_map*.json are merged by both,
+results must be the same.
+
+Then convex modes(CONVEX_MODES) are compared by shape / vertex count and
+pymunk step time with bodies moving around the static shapes.
+
+Usage:
+    python _scratch/bench_convex.py
+'''
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import glob
+import time
+
+import random
+
+import pymunk, pymunk.util
+
+from lib.foundation import *
+from lib.foundation.physics import _combine_n_reduce, _reduce_points, _reduce_shapes, triangulate_all
+
+
+def legacy_reduce_shapes(shapes:list):
+    count = len(shapes)
+    if count < 2:
+        return shapes, False
+
+    for ia in range(count - 1):
+        for ib in range(ia + 1, count):
+            reduction = _combine_n_reduce(shapes[ia], shapes[ib])
+            if reduction != None:
+                new_hulls = [reduction]
+                for j in range(count):
+                    if not (j in (ia, ib)):
+                        new_hulls.append(shapes[j])
+                return new_hulls, True
+
+    return shapes, False
+
+def legacy_merge(hulls:list) -> list:
+    reducing = True
+    while reducing:
+        hulls, reducing = legacy_reduce_shapes(hulls)
+    return hulls
+
+def legacy_get_convexes(shapes) -> list:
+    hulls = legacy_merge(triangulate_all(shapes))
+    return pymunk.util.convexise(triangulate_all([_reduce_points(hull) for hull in hulls]))
+
+def get_static_hit_boxes(map_file:str) -> list:
+    world = TiledMap(scale=2)
+    world.load_map(map_file)
+    hit_boxes = []
+    for layer in world.tile_layers.values():
+        if layer.properties and layer.properties.get('world_static', True):
+            hit_boxes.extend(list(sprite.get_adjusted_hit_box()) for sprite in layer)
+    return hit_boxes
+
+def get_step_time(convexes:list, bodies:int = 300, steps:int = 300) -> tuple[float, int]:
+    ''' (seconds per step, body count) of space with static convexes and circle bodies spread in free space '''
+    space = pymunk.Space()
+    space.add(*[pymunk.Poly(space.static_body, convex) for convex in convexes])
+    points = [point for convex in convexes for point in convex]
+    left, right = min(x for x, _ in points), max(x for x, _ in points)
+    bottom, top = min(y for _, y in points), max(y for _, y in points)
+    rng = random.Random(0)
+    for _ in range(bodies * 20):
+        if len(space.bodies) >= bodies: break
+        position = rng.uniform(left, right), rng.uniform(bottom, top)
+        if space.point_query_nearest(position, 12, pymunk.ShapeFilter()) is not None: continue
+        body = pymunk.Body(1, pymunk.moment_for_circle(1, 0, 12))
+        body.position = position
+        body.velocity = rng.uniform(-300, 300), rng.uniform(-300, 300)
+        space.add(body, pymunk.Circle(body, 12))
+    started = time.perf_counter()
+    for _ in range(steps):
+        space.step(1 / 60)
+    return (time.perf_counter() - started) / steps, len(space.bodies)
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    results = []
+    mode_results = []
+    for map_file in sorted(glob.glob('tiled/test_map*.json')):
+        hit_boxes = get_static_hit_boxes(map_file)
+        if not hit_boxes: continue
+        for mode in CONVEX_MODES:
+            convexes, t_build = timed(merge_convexes, [], hit_boxes, mode)
+            mode_results.append((map_file, mode, *get_shape_stats(convexes), t_build, *get_step_time(convexes)))
+        hulls = triangulate_all(hit_boxes)
+
+        legacy, t_legacy = timed(legacy_get_convexes, hit_boxes)
+        convexes, t_new = timed(get_convexes, hit_boxes)
+        assert legacy == convexes, map_file
+        legacy_hulls, t_legacy_merge = timed(legacy_merge, hulls)
+        new_hulls, t_merge = timed(_reduce_shapes, hulls)
+        assert legacy_hulls == new_hulls, map_file
+        results.append((map_file, len(hulls), len(convexes), t_legacy_merge, t_merge, t_legacy, t_new))
+
+    print(f'{"map":<24}{"hulls":>7}{"convexes":>10}{"merge legacy/new(s)":>22}{"total legacy/new(s)":>22}{"merge speedup":>15}')
+    for map_file, hull_count, convex_count, t_legacy_merge, t_merge, t_legacy, t_new in results:
+        print(f'{map_file:<24}{hull_count:>7}{convex_count:>10}'
+              f'{t_legacy_merge:>14.3f} /{t_merge:>6.3f}{t_legacy:>14.3f} /{t_new:>6.3f}'
+              f'{t_legacy_merge / max(t_merge, 1e-9):>14.1f}x')
+
+    print()
+    print(f'{"map":<24}{"mode":>10}{"shapes":>8}{"vertices":>10}{"build(s)":>10}{"step(ms)":>10}{"bodies":>8}')
+    for map_file, mode, shape_count, vertex_count, t_build, t_step, body_count in mode_results:
+        print(f'{map_file:<24}{mode:>10}{shape_count:>8}{vertex_count:>10}{t_build:>10.3f}{t_step * 1000:>10.3f}{body_count:>8}')
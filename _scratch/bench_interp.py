@@ -0,0 +1,67 @@
+'''
+Crowd interpolation : per actor scalar calls vs one array call.
+
+Checks array versions return same values with scalar versions, then times both.
+
+Usage:
+    python _scratch/bench_interp.py
+'''
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import random
+
+import numpy as np
+
+from lib.foundation.base import *
+
+COUNT = 5000
+DELTA_TIME = 1 / 60
+
+random.seed(0)
+currents = [random.uniform(-720, 720) for _ in range(COUNT)]
+targets = [random.uniform(-720, 720) if i % 7 else currents[i] + 0.0001 for i in range(COUNT)]
+speeds = [random.choice((0, 0.5, 3, 10)) for _ in range(COUNT)]
+vcurrents = [Vector(random.uniform(-500, 500), random.uniform(-500, 500)) for _ in range(COUNT)]
+vtargets = [Vector(random.uniform(-500, 500), random.uniform(-500, 500)) for _ in range(COUNT)]
+
+### population state kept in arrays
+a_currents, a_targets, a_speeds = np.array(currents), np.array(targets), np.array(speeds)
+a_vcurrents, a_vtargets = np.array(vcurrents), np.array(vtargets)
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+cases = {
+    'finterp_to' : (
+        lambda: [finterp_to(c, t, DELTA_TIME, s) for c, t, s in zip(currents, targets, speeds)],
+        lambda: finterp_to_array(a_currents, a_targets, DELTA_TIME, a_speeds),
+    ),
+    'rinterp_to' : (
+        lambda: [rinterp_to(c, t, DELTA_TIME, s) for c, t, s in zip(currents, targets, speeds)],
+        lambda: rinterp_to_array(a_currents, a_targets, DELTA_TIME, a_speeds),
+    ),
+    'vinterp_to' : (
+        lambda: [vinterp_to(c, t, DELTA_TIME, s) for c, t, s in zip(vcurrents, vtargets, speeds)],
+        lambda: vinterp_to_array(a_vcurrents, a_vtargets, DELTA_TIME, a_speeds),
+    ),
+    'get_positive_angle' : (
+        lambda: [get_positive_angle(c) for c in currents],
+        lambda: get_positive_angle_array(a_currents),
+    ),
+    'map_range_abs' : (
+        lambda: [map_range_abs(c, 15, 90, 3, 1, clamped=True) for c in currents],
+        lambda: map_range_abs_array(a_currents, 15, 90, 3, 1, clamped=True),
+    ),
+}
+
+if __name__ == '__main__':
+    print(f'{"case":<22}{"scalar(ms)":>12}{"array(ms)":>12}{"speedup":>9}')
+    for name, (scalar, array) in cases.items():
+        expected, t_scalar = timed(scalar)
+        result, t_array = timed(array)
+        assert np.allclose(np.asarray(expected, dtype=np.float64), result), name
+        print(f'{name:<22}{t_scalar:>12.2f}{t_array:>12.2f}{t_scalar / t_array:>8.1f}x')
@@ -0,0 +1,57 @@
+'''
+Sprite properties : per sprite dict copies vs shared PropertyTable.
+
+Properties of tiles of tiled/test_map3.json are placed COUNT times the way map loading does,
+as former per sprite dicts and as PropertyTable over shared tables of TiledMap.
+Both must read the same, then memory held by them is measured with tracemalloc.
+
+Usage:
+    python _scratch/bench_properties.py
+'''
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import tracemalloc
+
+from lib.foundation import *
+
+COUNT = 100_000
+MAP_FILE = 'tiled/test_map3.json'
+
+
+def legacy_properties(tile) -> dict:
+    ''' former _create_sprite_from_tile, a dict per sprite '''
+    properties = {}
+    if tile.properties is not None and len(tile.properties) > 0:
+        for key, value in tile.properties.items():
+            properties[key] = value
+    if tile.class_:
+        properties["class"] = tile.class_
+    properties["tile_id"] = tile.id
+    return properties
+
+def measured(func):
+    ''' (result, bytes held by result) '''
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, held
+
+
+if __name__ == '__main__':
+    world = TiledMap(scale=2)
+    world.load_map(MAP_FILE)
+    gids = [int(gid) for name in world.tile_layers if name in world._tile_layer_infos
+            for gid in world.get_gid_grid(name).ravel() if gid]
+    tiles = [world._get_tile_by_gid(gids[i % len(gids)]) for i in range(COUNT)]
+
+    legacy, legacy_bytes = measured(lambda: [legacy_properties(tile) for tile in tiles])
+    shared, shared_bytes = measured(lambda: [PropertyTable(world._get_tile_properties(tile)) for tile in tiles])
+    assert all(dict(a) == dict(b) for a, b in zip(legacy, shared))
+
+    print(f'{COUNT} sprites of {len(set(map(id, tiles)))} distinct tiles, {len(world._property_tables)} shared tables')
+    print(f'{"per sprite dict":<20}{legacy_bytes / 2**20:>10.2f} MiB')
+    print(f'{"PropertyTable":<20}{shared_bytes / 2**20:>10.2f} MiB')
+    print(f'{"reduction":<20}{(1 - shared_bytes / legacy_bytes) * 100:>10.1f} %')
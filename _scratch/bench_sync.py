@@ -0,0 +1,68 @@
+'''
+Body to sprite sync : former per body PhysicsBody._sync() vs batched PhysicsSpace.sync().
+
+COUNTS circle bodies are spawned in ObjectLayer with and without spatial hash,
+moved and synced by both ways. Sprite positions, angles and sprite list buffers must be the same,
+then time per sync is compared.
+
+Usage:
+    python _scratch/bench_sync.py
+'''
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+import time
+
+from lib.foundation import *
+
+COUNTS = (1000, 5000)
+STEPS = 20
+
+
+def build(count:int, use_spatial_hash:bool) -> tuple[PhysicsSpace, ObjectLayer, list]:
+    space = PhysicsSpace((0, -980), 1.0)
+    layer = ObjectLayer(space, use_spatial_hash=use_spatial_hash)
+    rng = random.Random(1)
+    bodies = []
+    for _ in range(count):
+        body = DynamicBody(SpriteCircle(8), position=Vector(rng.uniform(0, 2000), rng.uniform(0, 2000)))
+        body.spawn(layer)
+        body.physics.velocity = rng.uniform(-100, 100), rng.uniform(-100, 100)
+        body.physics.angular_velocity = rng.uniform(-3, 3)
+        bodies.append(body)
+    return space, layer, bodies
+
+def legacy_sync(space:PhysicsSpace):
+    for o in space._movable_objs:
+        if o.spawnned: o._owner._sync()
+
+def timed_sync(sync, space:PhysicsSpace) -> float:
+    ''' seconds per sync, space stepped between syncs '''
+    elapsed = 0.0
+    for _ in range(STEPS):
+        space.step(1 / 60)
+        started = time.perf_counter()
+        sync(space)
+        elapsed += time.perf_counter() - started
+    return elapsed / STEPS
+
+
+if __name__ == '__main__':
+    results = []
+    for use_spatial_hash in (False, True):
+        for count in COUNTS:
+            space_a, layer_a, bodies_a = build(count, use_spatial_hash)
+            space_b, layer_b, bodies_b = build(count, use_spatial_hash)
+            t_legacy = timed_sync(legacy_sync, space_a)
+            t_batched = timed_sync(PhysicsSpace.sync, space_b)
+            assert all(a.sprite.position == b.sprite.position and a.sprite.angle == b.sprite.angle
+                       for a, b in zip(bodies_a, bodies_b))
+            assert layer_a._sprite_pos_data[:count * 2] == layer_b._sprite_pos_data[:count * 2]
+            assert layer_a._sprite_angle_data[:count] == layer_b._sprite_angle_data[:count]
+            results.append((count, use_spatial_hash, t_legacy, t_batched))
+
+    print(f'{"bodies":>8}{"spatial hash":>14}{"legacy(ms)":>12}{"batched(ms)":>13}{"speedup":>10}')
+    for count, use_spatial_hash, t_legacy, t_batched in results:
+        print(f'{count:>8}{str(use_spatial_hash):>14}{t_legacy * 1000:>12.2f}{t_batched * 1000:>13.2f}'
+              f'{t_legacy / max(t_batched, 1e-9):>9.2f}x')
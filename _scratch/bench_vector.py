@@ -0,0 +1,116 @@
+'''
+Micro benchmark of Vector 2D fast path against generic n-D path.
+
+Generic path is the former implementation of each operation (zip, generator, sum)
+which is still used for non-2D vectors.
+
+Then MutableVector movement tick(per instance accumulator, pool acquire / release,
+pool scratch context) is compared against the fast immutable Vector chain.
+
+Usage:
+    python _scratch/bench_vector.py
+'''
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import math
+import timeit
+
+from lib.foundation.vector import Vector, MutableVector, VECTOR_POOL, vectors
+
+NUMBER = 200_000
+
+a = Vector(3.0, 4.0)
+b = Vector(-1.5, 2.25)
+
+
+def generic_length(v):
+    return math.sqrt(sum( x*x for x in v ))
+
+def generic_inner(v, w):
+    return sum(p * q for p, q in zip(v, w))
+
+def generic_angle(v):
+    norm = generic_length(v)
+    if not norm: return 0
+    angle = math.degrees(math.acos(generic_inner(vectors.right, v) / norm))
+    return 360 - angle if v[1] < 0 else angle
+
+def generic_unit(v):
+    norm = generic_length(v)
+    return tuple.__new__(Vector, (x / norm for x in v))
+
+def generic_clamp_length(v, max_length):
+    norm = generic_length(v)
+    if norm <= max_length: return v
+    return tuple.__new__(Vector, (x * max_length / norm for x in v))
+
+def generic_movement_tick(velocity, move_input, acceleration, delta_time, max_speed):
+    ''' same chain with SpriteMovement._set_movement '''
+    accel = generic_unit(move_input)._mul_nd(acceleration)._mul_nd(delta_time)
+    return generic_clamp_length(velocity._add_nd(accel), max_speed * delta_time)
+
+def movement_tick(velocity, move_input, acceleration, delta_time, max_speed):
+    return (velocity + move_input.unit * acceleration * delta_time).clamp_length(max_speed * delta_time)
+
+_acc = MutableVector()
+
+def mutable_movement_tick(velocity, move_input, acceleration, delta_time, max_speed, acc = _acc):
+    ''' same with SpriteMovement._set_movement, accumulator kept per instance '''
+    acc.assign(move_input).normalize_inplace().scale(acceleration * delta_time)
+    return acc.iadd(velocity).clamp_length_inplace(max_speed * delta_time).freeze()
+
+def pooled_movement_tick(velocity, move_input, acceleration, delta_time, max_speed):
+    acc = VECTOR_POOL.acquire()
+    result = mutable_movement_tick(velocity, move_input, acceleration, delta_time, max_speed, acc)
+    VECTOR_POOL.release(acc)
+    return result
+
+def scratch_movement_tick(velocity, move_input, acceleration, delta_time, max_speed):
+    with VECTOR_POOL.scratch() as acc:
+        return mutable_movement_tick(velocity, move_input, acceleration, delta_time, max_speed, acc)
+
+cases = {
+    'add' : (lambda: a + b, lambda: a._add_nd(b)),
+    'sub' : (lambda: a - b, lambda: a._sub_nd(b)),
+    'mul(scalar)' : (lambda: a * 1.5, lambda: a._mul_nd(1.5)),
+    'mul(dot)' : (lambda: a * b, lambda: generic_inner(a, b)),
+    'truediv' : (lambda: a / 2.0, lambda: a._truediv_nd(2.0)),
+    'length' : (lambda: a.length, lambda: generic_length(a)),
+    'angle' : (lambda: b.angle, lambda: generic_angle(b)),
+    'unit' : (lambda: b.unit, lambda: generic_unit(b)),
+    'movement tick' : (
+        lambda: movement_tick(a, b, 25, 0.016, 250),
+        lambda: generic_movement_tick(a, b, 25, 0.016, 250),
+    ),
+}
+
+mutable_cases = {
+    'per instance' : lambda: mutable_movement_tick(a, b, 25, 0.016, 250),
+    'pool acquire' : lambda: pooled_movement_tick(a, b, 25, 0.016, 250),
+    'pool scratch()' : lambda: scratch_movement_tick(a, b, 25, 0.016, 250),
+}
+
+def timed(func) -> float:
+    ''' microseconds per call '''
+    return min(timeit.repeat(func, number=NUMBER, repeat=3)) / NUMBER * 1e6
+
+if __name__ == '__main__':
+    print(f'{"case":<20}{"fast(us)":>10}{"generic(us)":>13}{"speedup":>9}')
+    for name, (fast, generic) in cases.items():
+        result = fast()
+        if isinstance(result, tuple): assert result.is_close(generic(), 1e-9), name
+        else: assert math.isclose(result, generic()), name
+        t_fast = timed(fast)
+        t_generic = timed(generic)
+        print(f'{name:<20}{t_fast:>10.3f}{t_generic:>13.3f}{t_generic / t_fast:>8.1f}x')
+
+    immutable = lambda: movement_tick(a, b, 25, 0.016, 250)
+    t_immutable = timed(immutable)
+    print()
+    print(f'{"movement tick":<20}{"time(us)":>10}{"vs immutable Vector":>21}')
+    print(f'{"immutable Vector":<20}{t_immutable:>10.3f}{1.0:>20.2f}x')
+    for name, func in mutable_cases.items():
+        assert func().is_close(immutable(), 1e-9), name
+        t_mutable = timed(func)
+        print(f'{name:<20}{t_mutable:>10.3f}{t_immutable / t_mutable:>20.2f}x')
@@ -0,0 +1,40 @@
+'''
+Tile sprite textures : shared texture registry vs former filename loading.
+
+Former map loading built tile sprites with filename=, which made sprite.textures = [sprite.texture].
+Tile sprites of MAP_FILES are loaded with the shared texture registry and must keep that,
+so set_texture(0) and texture swaps keep working on map tiles.
+
+Usage:
+    python _scratch/check_tile_textures.py
+'''
+import os, sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from lib.foundation import *
+
+MAP_FILES = ('tiled/test_map2.json', 'tiled/test_map3.json', 'tiled/test_map5.json', 'tiled/test_map6.json')
+
+
+def check_map(map_file:str) -> tuple[int, int]:
+    ''' returns (checked sprites, distinct textures) '''
+    tiled_map = TiledMap(scale=2)
+    tiled_map.load_map(map_file)
+    checked = 0
+    textures = set()
+    for name, layer in tiled_map.tile_layers.items():
+        for sprite in layer:
+            if sprite.texture is None: continue
+            assert sprite.textures == [sprite.texture], f'{map_file} {name} : textures {sprite.textures}'
+            assert sprite.textures[0] is sprite.texture
+            sprite.set_texture(0)
+            assert sprite.texture is sprite.textures[0]
+            textures.add(id(sprite.texture))
+            checked += 1
+    return checked, len(textures)
+
+
+if __name__ == '__main__':
+    for map_file in MAP_FILES:
+        checked, distinct = check_map(map_file)
+        print(f'{map_file:<28}{checked:>8} sprites{distinct:>6} textures  ok')
@@ -3,19 +3,25 @@ base feature codes
 joonhyuk@me.com
 """
 import os, sys, json
+import importlib
 import math
 
 from hashlib import md5
 
 from enum import Enum
-from typing import Iterable, Union
+from typing import Callable, Dict, Iterable, Optional, Union
 from collections import deque
+from collections.abc import Mapping, MutableMapping
+from bisect import bisect_right
+from functools import lru_cache
 from tqdm import tqdm
 
 from easing_functions import *
 
+import numpy as np
+
 # from config import *
-from .vector import Vector, vectors
+from .vector import Vector, MutableVector, VectorArray, VECTOR_POOL, vectors
 from .dice import *
 
 cubic_easeinout = CubicEaseInOut()
@@ -62,6 +68,76 @@ class PropertyFrom:
         setattr(getattr(owner, self.proxied), self.name, value)
 
 
+_DELETED = object()
+''' tombstone of shared key deleted in PropertyTable overlay '''
+
+class PropertyTable(MutableMapping):
+    '''
+    Properties of an instance over a shared read-only table(of tile, template...).
+    Writes go to an overlay dict made on first write, shared table is never changed.
+    Works as dict for sprite.properties, dict(table) for a plain copy.
+    '''
+    
+    __slots__ = ['shared', '_overlay']
+    
+    def __init__(self, shared: Mapping, overlay: Optional[dict] = None) -> None:
+        self.shared = shared
+        self._overlay = overlay
+    
+    def __getitem__(self, key):
+        overlay = self._overlay
+        if overlay is not None and key in overlay:
+            value = overlay[key]
+            if value is _DELETED: raise KeyError(key)
+            return value
+        return self.shared[key]
+    
+    def get(self, key, default = None):
+        overlay = self._overlay
+        if overlay is not None and key in overlay:
+            value = overlay[key]
+            return default if value is _DELETED else value
+        return self.shared.get(key, default)
+    
+    def __contains__(self, key) -> bool:
+        overlay = self._overlay
+        if overlay is not None and key in overlay:
+            return overlay[key] is not _DELETED
+        return key in self.shared
+    
+    def __setitem__(self, key, value) -> None:
+        if self._overlay is None: self._overlay = {}
+        self._overlay[key] = value
+    
+    def __delitem__(self, key) -> None:
+        if key not in self: raise KeyError(key)
+        if key in self.shared:
+            if self._overlay is None: self._overlay = {}
+            self._overlay[key] = _DELETED
+        else:
+            del self._overlay[key]
+    
+    def __iter__(self):
+        overlay = self._overlay
+        if overlay is None:
+            yield from self.shared
+            return
+        for key in self.shared:
+            if overlay.get(key) is not _DELETED: yield key
+        for key, value in overlay.items():
+            if key not in self.shared and value is not _DELETED: yield key
+    
+    def __len__(self) -> int:
+        if self._overlay is None: return len(self.shared)
+        return sum(1 for _ in self)
+    
+    def copy(self) -> dict:
+        return dict(self)
+    
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({dict(self)!r})'
+
+
 class Version(metaclass=SingletonType):
     '''planned to convert into singleton class'''
     def __init__(self, major:int = None, minor:int = None, patch:int = None, is_production = False, file = 'data/version.json', run_count_up = True) -> None:
@@ -153,9 +229,16 @@ def vinterp_to(current:Vector,
                speed:float = 1.0, 
                precision:float = 0.001):
     if speed <= 0: return target
-    delta = target - current
-    if delta.norm() < precision: return target
-    return current + delta * clamp(delta_time * speed, 0, 1)
+    if len(current) != 2:
+        delta = target - current
+        if delta.norm() < precision: return target
+        return current + delta * clamp(delta_time * speed, 0, 1)
+    delta = _vinterp_delta.assign(target).isub(current)
+    if delta.length < precision: return target
+    return delta.scale(clamp(delta_time * speed, 0, 1)).iadd(current).freeze()
+
+_vinterp_delta = MutableVector()
+''' scratch accumulator of vinterp_to (2D) '''
 
 def rinterp_to(current:float, 
                target:float,
@@ -215,6 +298,95 @@ def map_range_attenuation(value, in_min, in_max, out_start, out_min, out_max):
         return map_range(value, 0, in_min, out_start, out_min)
     return map_range(value, in_min, in_max, out_min, out_max)
 
+### array versions for crowds. same semantics with scalar versions above, element-wise.
+### arguments could be ndarray, list or scalar(broadcasted), returns ndarray.
+
+def _as_float_array(value) -> np.ndarray:
+    return np.asarray(value, dtype=np.float64)
+
+def clamp_array(value, in_min = None, in_max = None) -> np.ndarray:
+    value = _as_float_array(value)
+    if in_min is None and in_max is None: return value
+    if in_min is not None and in_max is not None and np.any(np.asarray(in_min) > np.asarray(in_max)):
+        raise ValueError('in_min > in_max')
+    return np.clip(value, in_min, in_max)
+
+def clamp_abs_array(value, in_min, in_max) -> np.ndarray:
+    value = _as_float_array(value)
+    result = np.minimum(np.abs(in_max), np.maximum(np.abs(in_min), np.abs(value)))
+    return np.where(value < 0, -result, result)
+
+def map_range_array(value, in_min, in_max, out_min, out_max, clamped = False) -> np.ndarray:
+    value = _as_float_array(value)
+    if clamped: value = clamp_array(value, in_min, in_max)
+    return ((value - in_min) / (in_max - in_min)) * (out_max - out_min) + out_min
+
+def map_range_abs_array(value, in_min, in_max, out_min, out_max, clamped = False) -> np.ndarray:
+    value = _as_float_array(value)
+    if clamped: value = clamp_abs_array(value, in_min, in_max)
+    result = map_range_array(np.abs(value), in_min, in_max, out_min, out_max)
+    return np.where(value < 0, -result, result)
+
+def map_range_attenuation_array(value, in_min, in_max, out_start, out_min, out_max) -> np.ndarray:
+    value = _as_float_array(value)
+    return np.where(value < in_min,
+                    map_range_array(value, 0, in_min, out_start, out_min),
+                    map_range_array(value, in_min, in_max, out_min, out_max))
+
+def get_shortest_angle_array(start, end) -> np.ndarray:
+    return ((_as_float_array(end) - start) + 180) % 360 - 180
+
+def get_positive_angle_array(degrees) -> np.ndarray:
+    '''convert angles in degrees to 0 <= x < 360'''
+    degrees = get_shortest_angle_array(0, degrees)
+    return np.where(degrees < 0, degrees + 360, degrees)
+
+def finterp_to_array(current,
+                     target,
+                     delta_time:float,
+                     speed = 1.0,
+                     precision:float = 0.001) -> np.ndarray:
+    current, target = np.broadcast_arrays(_as_float_array(current), _as_float_array(target))
+    delta = target - current
+    alpha = np.clip(delta_time * _as_float_array(speed), 0, 1)
+    snap = (np.asarray(speed) <= 0) | (np.abs(delta) < precision)
+    return np.where(snap, target, current + delta * alpha)
+
+def vinterp_to_array(current,
+                     target,
+                     delta_time:float,
+                     speed = 1.0,
+                     precision:float = 0.001):
+    '''
+    current, target : N x 2 ndarray, VectorArray or single Vector(broadcasted)
+    speed : scalar or (N,) array
+    returns VectorArray if current is VectorArray, else ndarray
+    '''
+    as_vector_array = isinstance(current, VectorArray)
+    current = _as_float_array(current).reshape(-1, 2)
+    target = np.broadcast_to(_as_float_array(target).reshape(-1, 2), current.shape)
+    delta = target - current
+    speed = _as_float_array(speed)
+    alpha = np.clip(delta_time * speed, 0, 1)[..., None]
+    snap = (speed <= 0) | (np.hypot(delta[:, 0], delta[:, 1]) < precision)
+    result = np.where(snap[:, None], target, current + delta * alpha)
+    if as_vector_array: return VectorArray(result)
+    return result
+
+def rinterp_to_array(current,
+                     target,
+                     delta_time:float,
+                     speed = 1.0,
+                     precision:float = 0.001) -> np.ndarray:
+    '''rotation angle interp. in degrees'''
+    current = _as_float_array(current)
+    target = _as_float_array(target)
+    delta = get_shortest_angle_array(current, target)
+    speedo = map_range_array(np.abs(delta), 15, 90, 3, 1, clamped=True)
+    a = delta * np.clip(delta_time * _as_float_array(speed) * speedo, 0, 1)
+    current, target, a = np.broadcast_arrays(current, target, a)
+    return np.where(np.abs(delta) < precision, target, current + a)
+
 def load_json(filepath:str) -> dict:
     with open(get_path(filepath), 'r') as json_file:
         return json.load(json_file)
@@ -228,8 +400,13 @@ def get_from_dict(dict:dict, keyword:str, default:... = None):
         return dict[keyword]
     return default
 
+@lru_cache(maxsize=256)
+def _get_easing(easing_class, out_min, out_max):
+    ''' easing object is immutable in use, so share one per arguments '''
+    return easing_class(out_min, out_max)
+
 def map_range_easing(value, in_min, in_max, out_min, out_max, clamped=False, easing_class = LinearInOut):
-    return easing_class(out_min, out_max)(map_range(value, in_min, in_max, 0, 1, clamped))
+    return _get_easing(easing_class, out_min, out_max)(map_range(value, in_min, in_max, 0, 1, clamped))
 
 def get_curve_value(x:float, curve:dict, easing_class = LinearInOut):
     '''
@@ -276,6 +453,97 @@ def get_curve_value(x:float, curve:dict, easing_class = LinearInOut):
     
     return easing_class(y_start, y_end)(alpha)
 
+class Curve:
+    '''
+    Precompiled version of get_curve_value. Compiles curve dict once,
+    evaluates with bisect. Same result with get_curve_value(x, curve, easing_class).
+    
+    Call with float or ndarray.
+    lut_resolution : if > 0, samples the curve in key range once and linearly
+    interpolates the samples afterwards. Approximation for expensive easings.
+    
+    i.e.
+    speed_curve = Curve({0:1.0, 90:0.75, 180:0.5, 'rclamp':True})
+    speed_curve(45), speed_curve(np.array([0, 45, 200]))
+    '''
+    
+    __slots__ = ('keys', 'values', 'lclamp', 'rclamp', 'easing_class', 
+                 '_points', '_easings', '_easing', '_lut', '_lut_step')
+    
+    def __init__(self, curve:dict, easing_class = LinearInOut, lut_resolution:int = 0) -> None:
+        self._points = {key : value for key, value in curve.items() if isinstance(key, (float, int))}
+        if not self._points: raise ValueError('Curve requires at least one key')
+        self.keys:list[float] = sorted(self._points)
+        self.values:list[float] = [self._points[key] for key in self.keys]
+        self.lclamp = bool(get_from_dict(curve, 'lclamp'))
+        self.rclamp = bool(get_from_dict(curve, 'rclamp'))
+        self.easing_class = easing_class
+        self._easings = [easing_class(start, end) for start, end in zip(self.values, self.values[1:])]
+        ''' easing object of each segment '''
+        self._easing = easing_class()
+        ''' for array evaluation, func() of easing depends only on class '''
+        self._lut = None
+        self._lut_step = 0.0
+        if lut_resolution > 0 and len(self.keys) > 1:
+            samples = np.linspace(self.keys[0], self.keys[-1], lut_resolution + 1)
+            self._lut = self._evaluate_array(samples)
+            self._lut_step = (self.keys[-1] - self.keys[0]) / lut_resolution
+    
+    def __call__(self, x):
+        if isinstance(x, (float, int)): return self.evaluate(x)
+        return self.evaluate_array(x)
+    
+    def evaluate(self, x:float) -> float:
+        keys = self.keys
+        if len(keys) == 1: return self.values[0]
+        if x in self._points: return self._points[x]
+        if x < keys[0]:
+            if self.lclamp: return self.values[0]
+            index = 0
+        elif x > keys[-1]:
+            if self.rclamp: return self.values[-1]
+            index = len(keys) - 2
+        else:
+            if self._lut is not None:
+                position = (x - keys[0]) / self._lut_step
+                lut_index = min(int(position), len(self._lut) - 2)
+                start = self._lut[lut_index]
+                return float(start + (self._lut[lut_index + 1] - start) * (position - lut_index))
+            index = bisect_right(keys, x) - 1
+        start, end = keys[index], keys[index + 1]
+        return self._easings[index]((x - start) / (end - start))
+    
+    def evaluate_array(self, x) -> np.ndarray:
+        x = _as_float_array(x)
+        if self._lut is None: return self._evaluate_array(x)
+        keys = self.keys
+        inside = (x >= keys[0]) & (x <= keys[-1])
+        if inside.all(): return np.interp(x, np.linspace(keys[0], keys[-1], len(self._lut)), self._lut)
+        result = self._evaluate_array(x)
+        result[inside] = np.interp(x[inside], np.linspace(keys[0], keys[-1], len(self._lut)), self._lut)
+        return result
+    
+    def _evaluate_array(self, x:np.ndarray) -> np.ndarray:
+        keys = np.asarray(self.keys, dtype=np.float64)
+        values = np.asarray(self.values, dtype=np.float64)
+        if len(keys) == 1: return np.full(x.shape, values[0])
+        index = np.clip(np.searchsorted(keys, x, side='right') - 1, 0, len(keys) - 2)
+        start, end = keys[index], keys[index + 1]
+        alpha = (x - start) / (end - start)
+        ### same as EasingBase.ease
+        limit = self._easing.limit
+        t = (limit[0] * (1 - alpha) + limit[1] * alpha) / self._easing.duration
+        if self.easing_class is LinearInOut:
+            eased = t
+        else:
+            eased = np.frompyfunc(self._easing.func, 1, 1)(t).astype(np.float64)
+        result = values[index + 1] * eased + values[index] * (1 - eased)
+        result = np.where(x == start, values[index], result)
+        result = np.where(x == end, values[index + 1], result)
+        if self.lclamp: result = np.where(x < keys[0], values[0], result)
+        if self.rclamp: result = np.where(x > keys[-1], values[-1], result)
+        return result
+
 def avg_generator(value, num_limit:int = 10):
     '''
     generator for average value
@@ -342,11 +610,63 @@ def get_random_pos(
     
     return Vector(rand_x, rand_y).rotate(angle)
 
+CLASS_REGISTRY: Dict[str, Callable] = {}
+''' Tiled class name to class(or factory callable of sprite = ...) of objects made from tiles '''
+BATCH_FACTORIES: Dict[str, Callable] = {}
+''' Tiled class name to factory making objects from list of sprites at once '''
+
+def register_class(target: Callable = None, *, name: str = None):
+    '''
+    Register class for Tiled class of tiles, by decorator or call.
+    Called with sprite = sprite of tile, like class_(sprite = sprite).
+    
+    ```
+        @register_class
+        class Crate(Actor): ...
+        
+        @register_class(name = 'crate')
+        class Crate(Actor): ...
+        
+        register_class(make_crate, name = 'crate')
+    ```
+    '''
+    def decorator(target: Callable) -> Callable:
+        CLASS_REGISTRY[name or target.__name__] = target
+        return target
+    if target is None: return decorator
+    return decorator(target)
+
+def register_batch_factory(name: str, factory: Callable[[list], list]) -> None:
+    '''
+    Register factory making objects of Tiled class from list of sprites in one call.
+    Must return objects in order of sprites. Takes precedence over register_class().
+    '''
+    BATCH_FACTORIES[name] = factory
+
+def register_module(module, base: type = None) -> int:
+    ''' Register classes defined in module(or module name), subclasses of base only if given. Returns count '''
+    if isinstance(module, str): module = importlib.import_module(module)
+    count = 0
+    for name, value in vars(module).items():
+        if not isinstance(value, type) or value.__module__ != module.__name__: continue
+        if base is not None and not issubclass(value, base): continue
+        CLASS_REGISTRY[name] = value
+        count += 1
+    return count
+
+def unregister_class(name: str) -> None:
+    CLASS_REGISTRY.pop(name, None)
+    BATCH_FACTORIES.pop(name, None)
+
+def resolve_class(name: Optional[str]) -> Optional[Callable]:
+    ''' Registered class of Tiled class. Falls back to class of same name in __main__ '''
+    if not name: return None
+    registered = CLASS_REGISTRY.get(name)
+    if registered is not None: return registered
+    return getattr(sys.modules.get('__main__'), name, None)
+
 def get_class_loaded(name: str):
-    try:
-        return getattr(sys.modules['__main__'], name)
-    except:
-        return None
+    return resolve_class(name)
 
 def rotate_point(point: tuple, degree: float, center: tuple = (0, 0), precision = 2) -> Vector:
     tmp_x = point[0] - center[0]
@@ -0,0 +1,103 @@
+'''
+Static collision cache(.scc) of Tiled maps
+
+Merged static collision is expensive to build and same for same map and load options.
+Cache is keyed by md5 of map hash, collision options(scale, hit box, offset, layer options)
+and engine versions, so any change of them invalidates it. No pickle, plain numbers only.
+
+Layout (little endian)
+    header : magic, version, key, shape count, coordinate count
+    data   : uint32 vertex counts of shapes, float64 coordinates(x, y, x, y, ...) aligned to 8 bytes
+'''
+from __future__ import annotations
+
+import os
+import json
+import mmap
+import struct
+
+from hashlib import md5
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import arcade, pymunk
+
+from .base import get_path
+from .vector import Vector
+
+COLLISION_CACHE_MAGIC = b'SCC\x00'
+COLLISION_CACHE_VERSION = 1
+COLLISION_CACHE_SUFFIX = '.scc'
+
+_HEADER = struct.Struct('<4sI32sQQ')
+''' magic, version, key, shape count, coordinate count '''
+
+
+def get_collision_cache_path(map_file:Union[str, Path]) -> str:
+    return os.path.splitext(get_path(str(map_file)))[0] + COLLISION_CACHE_SUFFIX
+
+def get_collision_cache_key(map_hash:str, options:dict) -> str:
+    ''' md5 hexdigest of map hash, json compatible collision options and engine versions '''
+    return md5(json.dumps({
+        'map' : map_hash,
+        'options' : options,
+        'cache' : COLLISION_CACHE_VERSION,
+        'arcade' : arcade.version.VERSION,
+        'pymunk' : pymunk.version,
+    }, sort_keys=True).encode('utf-8')).hexdigest()
+
+def pack_shapes(shapes:list) -> tuple[np.ndarray, np.ndarray]:
+    ''' list of shapes(list of points) to (uint32 vertex counts, float64 flat coordinates) '''
+    counts = np.array([len(shape) for shape in shapes], dtype='<u4')
+    coords = np.array([xy for shape in shapes for point in shape for xy in point], dtype='<f8')
+    return counts, coords
+
+def unpack_shapes(counts:np.ndarray, coords:np.ndarray) -> list[list[Vector]]:
+    points = coords.reshape(-1, 2).tolist()
+    shapes = []
+    start = 0
+    for count in counts.tolist():
+        shapes.append([Vector(*point) for point in points[start:start + count]])
+        start += count
+    return shapes
+
+
+def read_collision_cache(map_file:Union[str, Path], key:str) -> Optional[list[list[Vector]]]:
+    ''' Returns cached static collision of map, None if not cached or key is different '''
+    try:
+        with open(get_collision_cache_path(map_file), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                magic, version, cached_key, shape_count, coords_count = _HEADER.unpack_from(buffer, 0)
+                if magic != COLLISION_CACHE_MAGIC or version != COLLISION_CACHE_VERSION: return None
+                if cached_key != key.encode('ascii'): return None
+                counts = np.frombuffer(buffer, dtype='<u4', count=shape_count, offset=_HEADER.size)
+                coords_offset = _HEADER.size + (counts.nbytes + 7) // 8 * 8
+                coords = np.frombuffer(buffer, dtype='<f8', count=coords_count, offset=coords_offset)
+                shapes = unpack_shapes(counts, coords)
+                del counts, coords      ### release buffer before closing mmap
+                return shapes
+    except (OSError, ValueError, struct.error):
+        return None
+
+def write_collision_cache(map_file:Union[str, Path], key:str, shapes:list) -> Optional[str]:
+    ''' Write static collision of map atomically. Returns path of cache, None if failed '''
+    counts, coords = pack_shapes(shapes)
+    count_bytes = counts.tobytes()
+    path = get_collision_cache_path(map_file)
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(_HEADER.pack(COLLISION_CACHE_MAGIC, COLLISION_CACHE_VERSION, key.encode('ascii'),
+                                 len(counts), len(coords)))
+            f.write(count_bytes + b'\0' * ((len(count_bytes) + 7) // 8 * 8 - len(count_bytes)))
+            f.write(coords.tobytes())
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f'Warning, failed to write collision cache {path} : {e}')
+        return None
+    return path
+
+
+if __name__ != "__main__":
+    print("include", __name__, ":", __file__)
@@ -145,6 +145,9 @@ class SpriteMovement(MovementHandler):
     
     # __slots__ = 'size', 'max_speed_run', 'max_speed_walk', 'max_rotation_speed', ''
     
+    _directional_speed_curve = Curve(CONFIG.directional_speed)
+    ''' compiled CONFIG.directional_speed '''
+    
     def __init__(self, 
                  capsule_radius = 16, 
                  max_speed_run = 250, 
@@ -170,6 +173,8 @@ class SpriteMovement(MovementHandler):
         self._braking = braking if braking is not None else acceleration
         ''' default braking friction. if set to 0, no braking '''
         self._last_tick_speed = 0.0
+        self._velocity_acc = MutableVector()
+        ''' scratch accumulator of _set_movement, reused every tick '''
         self.move_input:Vector = Vector()
         self.desired_rotation:float = 0.0
         
@@ -218,8 +223,10 @@ class SpriteMovement(MovementHandler):
         max_speed = map_range_attenuation(self.move_input.length, 0.7, 1, 0, self.max_speed_walk, self.max_speed_run)
         max_speed *= self._get_directional_speed_multiplier()
         ''' apply directional speed limit '''
-        self.velocity = (self.velocity + self.move_input.unit * accel * delta_time).clamp_length(max_speed * delta_time)
-        self._last_tick_speed = self.velocity.length
+        velocity = self._velocity_acc.assign(self.move_input).normalize_inplace().scale(accel * delta_time)
+        velocity.iadd(self.velocity).clamp_length_inplace(max_speed * delta_time)
+        self._last_tick_speed = velocity.length
+        self.velocity = velocity.freeze()
         self._debug_braking_time = 0.0
         
         ### debug start
@@ -255,7 +262,7 @@ class SpriteMovement(MovementHandler):
     
     def _get_directional_speed_multiplier(self):
         angle = abs(get_shortest_angle(self.rotation, self.velocity.angle))
-        return get_curve_value(angle, CONFIG.directional_speed)
+        return self._directional_speed_curve.evaluate(angle)
     
     def move(self, input:Vector = Vector()):
         self.move_input = input
@@ -523,6 +530,8 @@ class CameraHandler(Handler):
         self.boom_length = boom_length
         self.dynamic_boom = dynamic_boom
         self.max_lag_distance = max_lag_distance
+        self._boom_acc = MutableVector()
+        ''' scratch accumulator of _get_boom_vector '''
         # self.owner_has_position = True
     
     # def on_spawn(self):
@@ -569,7 +578,7 @@ class CameraHandler(Handler):
         
         in_min = GAME.screen_shortside // 5
         in_max = GAME.screen_shortside // 1.2
-        ''' 최적화 필요 need optimization '''
-        return self.body.forward_vector.unit * self.boom_length * map_range(distv.length, in_min, in_max, 0, 1, clamped=True) * alpha
+        ratio = self.boom_length * map_range(distv.length, in_min, in_max, 0, 1, clamped=True) * alpha
+        return self._boom_acc.assign(self.body.forward_vector).normalize_inplace().scale(ratio).freeze()
 
 
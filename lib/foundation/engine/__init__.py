@@ -3,6 +3,7 @@ from .app import *
 from .action import *
 from .controller import *
 from .body import *
+from .hitbox import *
 from .primitive import *
 from .movement import *
 from .temp import *
@@ -847,3 +847,71 @@ class KinematicBody(DynamicBody):
     
     # velocity: Vector = property(Body._get_veloticy, Body._set_velocity)
 
+
+
+_pymunk_moved_subscribers: dict[type, bool] = {}
+''' sprite class overrides pymunk_moved, by class '''
+
+def _is_pymunk_moved_subscriber(sprite: arcade.Sprite) -> bool:
+    sprite_type = type(sprite)
+    subscribed = _pymunk_moved_subscribers.get(sprite_type)
+    if subscribed is None:
+        subscribed = _pymunk_moved_subscribers[sprite_type] = sprite_type.pymunk_moved is not arcade.Sprite.pymunk_moved
+    return subscribed
+
+def sync_physics_bodies(handlers: list[PhysicsBody], positions: list, angles: list[float]) -> int:
+    '''
+    Batched PhysicsBody._sync() of awake bodies, see PhysicsSpace.sync().
+    
+    positions : body positions(Vec2d) in order of handlers
+    angles : body angles in degrees in order of handlers
+    
+    Sprites get position / angle without setters, spatial hashes are updated only for lists using them
+    and buffers of each sprite list are written at once with numpy.
+    pymunk_moved is called only for sprites overriding it. Returns count of synced bodies.
+    '''
+    changes_by_list: dict[arcade.SpriteList, tuple[list[int], list[float], list[float]]] = {}
+    ''' slots, flat positions and angles to write, by sprite list '''
+    moved = []
+    subscribers = _pymunk_moved_subscribers
+    for row, handler in enumerate(handlers):
+        sprite = handler.sprite
+        position = positions[row]
+        angle = angles[row]
+        prev_position = sprite._position
+        prev_angle = sprite._angle
+        subscribed = subscribers.get(type(sprite))
+        if subscribed is None: subscribed = _is_pymunk_moved_subscriber(sprite)
+        if subscribed:
+            moved.append((sprite, handler, position[0] - prev_position[0], position[1] - prev_position[1], angle - prev_angle))
+        if position == prev_position and angle == prev_angle: continue
+        
+        sprite_lists = sprite.sprite_lists
+        hashed = [sprite_list for sprite_list in sprite_lists if sprite_list._use_spatial_hash]
+        if hashed: sprite.clear_spatial_hashes()     ### same checks with Sprite.position setter
+        sprite._position = position
+        sprite._angle = angle
+        sprite._point_list_cache = None
+        for sprite_list in hashed:
+            sprite_list.spatial_hash.insert_object_for_box(sprite)
+        
+        for sprite_list in sprite_lists:
+            changes = changes_by_list.get(sprite_list)
+            if changes is None: changes = changes_by_list[sprite_list] = ([], [], [])
+            changes[0].append(sprite_list.sprite_slot[sprite])
+            changes[1].extend(position)
+            changes[2].append(angle)
+    
+    for sprite_list, (slots, xy, degrees) in changes_by_list.items():
+        ### views must be released before sprite list grows its buffers
+        pos_data = np.frombuffer(sprite_list._sprite_pos_data, dtype=np.float32).reshape(-1, 2)
+        pos_data[slots] = np.array(xy, dtype=np.float32).reshape(-1, 2)
+        angle_data = np.frombuffer(sprite_list._sprite_angle_data, dtype=np.float32)
+        angle_data[slots] = degrees
+        del pos_data, angle_data
+        sprite_list._sprite_pos_changed = True
+        sprite_list._sprite_angle_changed = True
+    
+    for sprite, handler, dx, dy, d_angle in moved:
+        sprite.pymunk_moved(handler, dx, dy, d_angle)
+    return len(handlers)
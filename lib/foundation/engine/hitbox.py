@@ -0,0 +1,152 @@
+'''
+Persistent hit box cache
+
+Tracing hit box from pixels('Detailed' especially) is expensive and
+gives same result for same image region. Results are kept in json file
+keyed by image content hash, crop rectangle, flip flags, algorithm and detail.
+'''
+from __future__ import annotations
+
+import os
+import json
+import atexit
+
+from hashlib import md5
+from typing import Optional, Union
+from pathlib import Path
+
+import arcade
+from arcade.resources import resolve_resource_path
+
+from ..base import get_path
+
+
+HITBOX_CACHE_VERSION = 1
+
+
+class HitBoxCache:
+    '''
+    i.e.
+    ```
+        texture = arcade.load_texture(file, x, y, w, h, hit_box_algorithm='Detailed')
+        HITBOX_CACHE.apply(texture, file, (x, y, w, h), hit_box_algorithm='Detailed')
+        texture.hit_box_points  ### no pixel tracing if cached
+    ```
+    '''
+
+    __slots__ = ('filepath', '_entries', '_file_hashes', '_dirty', '_loaded')
+
+    def __init__(self, filepath:str = 'data/hitbox_cache.json') -> None:
+        self.filepath = filepath
+        self._entries:dict[str, tuple] = {}
+        ''' hit box points by key '''
+        self._file_hashes:dict[tuple, str] = {}
+        ''' md5 of image file by (path, mtime, size) '''
+        self._dirty = False
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            with open(get_path(self.filepath), 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != HITBOX_CACHE_VERSION: return
+        for key, points in data.get('entries', {}).items():
+            self._entries[key] = tuple(tuple(point) for point in points)
+
+    def _get_file_hash(self, image_file:Union[str, Path]) -> Optional[str]:
+        try:
+            path = str(resolve_resource_path(image_file))
+            stat = os.stat(path)
+        except OSError:
+            return None
+        file_key = (path, stat.st_mtime_ns, stat.st_size)
+        try:
+            return self._file_hashes[file_key]
+        except KeyError:
+            with open(path, 'rb') as f:
+                hexdigest = self._file_hashes[file_key] = md5(f.read()).hexdigest()
+            return hexdigest
+
+    def get_key(
+        self,
+        image_file:Union[str, Path],
+        region:tuple = (0, 0, 0, 0),
+        flipped_horizontally:bool = False,
+        flipped_vertically:bool = False,
+        flipped_diagonally:bool = False,
+        hit_box_algorithm:str = 'Simple',
+        hit_box_detail:float = 4.5,
+    ) -> Optional[str]:
+        ''' None if image file is not available(i.e. generated image) '''
+        file_hash = self._get_file_hash(image_file)
+        if file_hash is None: return None
+        flips = ''.join('1' if flip else '0' for flip in (flipped_horizontally, flipped_vertically, flipped_diagonally))
+        return f'{file_hash}:{",".join(map(str, region))}:{flips}:{hit_box_algorithm}:{hit_box_detail}'
+
+    def apply(
+        self,
+        texture:arcade.Texture,
+        image_file:Union[str, Path],
+        region:tuple = (0, 0, 0, 0),
+        flipped_horizontally:bool = False,
+        flipped_vertically:bool = False,
+        flipped_diagonally:bool = False,
+        hit_box_algorithm:str = 'Simple',
+        hit_box_detail:float = 4.5,
+    ) -> arcade.Texture:
+        '''
+        Set cached hit box points to texture, or compute and store them.
+        'None' algorithm is not cached, it's just a rectangle.
+        
+        arcade texture cache shares one texture for any hit_box_detail, so texture made with
+        other algorithm / detail than given is left as is, its hull would be stored under wrong key.
+        '''
+        if texture._hit_box_points is not None: return texture
+        if hit_box_algorithm not in ('Simple', 'Detailed'): return texture
+        if (texture._hit_box_algorithm, texture._hit_box_detail) != (hit_box_algorithm, hit_box_detail): return texture
+        if not self._loaded: self._load()
+        key = self.get_key(image_file, region,
+                           flipped_horizontally, flipped_vertically, flipped_diagonally,
+                           hit_box_algorithm, hit_box_detail)
+        if key is None: return texture
+
+        points = self._entries.get(key)
+        if points is not None:
+            texture._hit_box_points = points
+        else:
+            self._entries[key] = tuple(tuple(point) for point in texture.hit_box_points)
+            self._dirty = True
+        return texture
+
+    def flush(self) -> None:
+        ''' write to file if changed '''
+        if not self._dirty: return
+        filepath = get_path(self.filepath)
+        temp_filepath = filepath + '.tmp'
+        try:
+            with open(temp_filepath, 'w') as f:
+                json.dump({'version' : HITBOX_CACHE_VERSION, 'entries' : self._entries}, f)
+            os.replace(temp_filepath, filepath)
+        except OSError as e:
+            print(f'Warning, failed to write hit box cache {filepath} : {e}')
+            return
+        self._dirty = False
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+HITBOX_CACHE = HitBoxCache()
+''' shared hit box cache, flushed at exit '''
+atexit.register(HITBOX_CACHE.flush)
+
+
+if __name__ != "__main__":
+    print("include", __name__, ":", __file__)
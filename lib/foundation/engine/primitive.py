@@ -14,6 +14,7 @@ import arcade.color as colors
 from ..vector import Vector
 from config import *
 from .object import *
+from .hitbox import HITBOX_CACHE
 from ..utils import schedule_once
 
 class GLTexture(arcade.Texture):
@@ -39,7 +40,20 @@ class Sprite(GameObject, arcade.Sprite):
         position: Vector = None,
         ):
         GameObject.__init__(self)
+        loaded = texture is None and filename is not None
+        if loaded:
+            ### load texture here to apply cached hit box before arcade computes it
+            texture = arcade.load_texture(filename, image_x, image_y, image_width, image_height, 
+                                          flipped_horizontally=flipped_horizontally, 
+                                          flipped_vertically=flipped_vertically, 
+                                          flipped_diagonally=flipped_diagonally, 
+                                          hit_box_algorithm=hit_box_algorithm, 
+                                          hit_box_detail=hit_box_detail)
+            HITBOX_CACHE.apply(texture, filename, (image_x, image_y, image_width, image_height), 
+                               flipped_horizontally, flipped_vertically, flipped_diagonally, 
+                               hit_box_algorithm, hit_box_detail)
         arcade.Sprite.__init__(self, filename, scale, image_x, image_y, image_width, image_height, center_x, center_y, repeat_count_x, repeat_count_y, flipped_horizontally, flipped_vertically, flipped_diagonally, hit_box_algorithm, hit_box_detail, texture, angle)
+        if loaded: self.textures = [texture]    ### as arcade does when it loads from filename
         self._initial_scale = scale
         self._relative_scale = 1.0
         if position is not None:
@@ -0,0 +1,279 @@
+'''
+Compiled map file(.tmc) for fast map loading
+
+Binary artifact of Tiled JSON map, written by world.compile_map().
+Tile grids and static collision are read with memory map, no json parsing of tile data.
+
+Layout (little endian)
+    header : magic, version, md5 of map json, meta offset / length, data offset
+    meta   : utf-8 json. map json without tile data, grid table, collision table, build options
+    data   : uint32 gid grids(row major), uint32 vertex counts and float64 coordinates of static collision
+'''
+from __future__ import annotations
+
+import os
+import json
+import mmap
+import struct
+
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+import pytiled_parser
+from pytiled_parser.common_types import OrderedPair, Size
+from pytiled_parser.parsers.json.layer import parse as parse_json_layer
+from pytiled_parser.parsers.json.properties import parse as parse_properties
+from pytiled_parser.parsers.json.tileset import parse as parse_json_tileset
+from pytiled_parser.parsers.tmx.tileset import parse as parse_tmx_tileset
+from pytiled_parser.util import check_format, parse_color
+import xml.etree.ElementTree as etree
+
+from .base import get_path
+from .vector import Vector
+from .collisioncache import pack_shapes, unpack_shapes
+
+COMPILED_MAP_MAGIC = b'TMC\x00'
+COMPILED_MAP_VERSION = 1
+COMPILED_MAP_SUFFIX = '.tmc'
+
+_HEADER = struct.Struct('<4sI32sQQQ')
+''' magic, version, md5, meta offset, meta length, data offset '''
+_ALIGN = 8
+
+
+def get_compiled_map_path(filepath:Union[str, Path]) -> str:
+    return os.path.splitext(get_path(str(filepath)))[0] + COMPILED_MAP_SUFFIX
+
+def _iter_raw_layers(raw_layers:list):
+    for raw_layer in raw_layers:
+        yield raw_layer
+        if raw_layer['type'] == 'group':
+            yield from _iter_raw_layers(raw_layer.get('layers', []))
+
+def _iter_layers(layers:list):
+    for layer in layers:
+        yield layer
+        if isinstance(layer, pytiled_parser.LayerGroup):
+            yield from _iter_layers(layer.layers or [])
+
+def _aligned(offset:int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def write_compiled_map(
+    filepath:Union[str, Path],
+    raw_map:dict,
+    tiled_map:pytiled_parser.TiledMap,
+    map_hash:str,
+    static_collision:Optional[list] = None,
+    options:Optional[dict] = None,
+) -> str:
+    '''
+    Write compiled map next to map json. Returns path of compiled map.
+
+    raw_map : loaded map json
+    tiled_map : parsed map of raw_map, for decoded tile grids
+    static_collision : list of convex shapes(list of points)
+    options : build options of static collision(scale, hit box...), checked when loading
+    '''
+    if tiled_map.infinite: raise AttributeError('Infinite map currently not supported')
+    raw_map = json.loads(json.dumps(raw_map))   ### deep copy
+    grids = {layer.id : layer.data for layer in _iter_layers(tiled_map.layers)
+             if isinstance(layer, pytiled_parser.TileLayer)}
+
+    blobs:list[bytes] = []
+    offset = 0
+    def add_blob(blob:bytes) -> int:
+        nonlocal offset
+        start = offset
+        padded = blob + b'\0' * (_aligned(len(blob)) - len(blob))
+        blobs.append(padded)
+        offset += len(padded)
+        return start
+
+    grid_table = {}
+    for raw_layer in _iter_raw_layers(raw_map['layers']):
+        if raw_layer['type'] != 'tilelayer': continue
+        grid = np.asarray(grids[raw_layer['id']], dtype='<u4').reshape(raw_layer['height'], raw_layer['width'])
+        grid_table[str(raw_layer['id'])] = [add_blob(grid.tobytes()), raw_layer['height'], raw_layer['width']]
+        for key in ('data', 'encoding', 'compression'):
+            raw_layer.pop(key, None)
+
+    collision_table = None
+    if static_collision:
+        counts, coords = pack_shapes(static_collision)
+        collision_table = [add_blob(counts.tobytes()), len(counts), add_blob(coords.tobytes()), len(coords)]
+
+    meta = json.dumps({
+        'map' : raw_map,
+        'grids' : grid_table,
+        'collision' : collision_table,
+        'options' : options or {},
+    }).encode('utf-8')
+
+    meta_offset = _HEADER.size
+    data_offset = _aligned(meta_offset + len(meta))
+    header = _HEADER.pack(COMPILED_MAP_MAGIC, COMPILED_MAP_VERSION, map_hash.encode('ascii'),
+                          meta_offset, len(meta), data_offset)
+
+    compiled_path = get_compiled_map_path(filepath)
+    temp_path = compiled_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(meta)
+        f.write(b'\0' * (data_offset - meta_offset - len(meta)))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temp_path, compiled_path)
+    return compiled_path
+
+
+class CompiledMap:
+    '''
+    Memory mapped compiled map
+
+    i.e.
+    ```
+        compiled = CompiledMap.open_if_fresh('tiled/test_map3.json')
+        if compiled: tiled_map = compiled.build_tiled_map()
+    ```
+    '''
+
+    __slots__ = ('path', 'map_file', 'map_hash', 'meta', '_file', '_buffer', '_data_offset')
+
+    def __init__(self, path:str, map_file:Union[str, Path]) -> None:
+        self.path = path
+        self.map_file = Path(get_path(str(map_file)))
+        self._file = open(path, 'rb')
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, map_hash, meta_offset, meta_length, self._data_offset = _HEADER.unpack_from(self._buffer, 0)
+            if magic != COMPILED_MAP_MAGIC or version != COMPILED_MAP_VERSION:
+                raise ValueError(f'Not a compiled map of version {COMPILED_MAP_VERSION} : {path}')
+            self.map_hash:str = map_hash.decode('ascii')
+            self.meta:dict = json.loads(self._buffer[meta_offset:meta_offset + meta_length])
+        except:
+            self.close()
+            raise
+
+    @classmethod
+    def open_if_fresh(cls, map_file:Union[str, Path]) -> Optional[CompiledMap]:
+        ''' Returns compiled map if exists and newer than map json and its external tilesets, else None '''
+        compiled_path = get_compiled_map_path(map_file)
+        try:
+            compiled_mtime = os.path.getmtime(compiled_path)
+            if compiled_mtime < os.path.getmtime(get_path(str(map_file))):
+                return None
+            compiled = cls(compiled_path, map_file)
+        except (OSError, ValueError, struct.error):
+            return None
+        try:
+            if all(os.path.getmtime(path) <= compiled_mtime for path in compiled.get_tileset_paths().values()):
+                return compiled
+        except OSError:
+            pass
+        compiled.close()
+        return None
+
+    def close(self) -> None:
+        buffer = getattr(self, '_buffer', None)
+        if buffer is not None:
+            try:
+                buffer.close()
+            except BufferError:
+                pass    ### grids still in use, closed with the last reference
+        self._file.close()
+
+    def get_grid(self, layer_id:int) -> np.ndarray:
+        ''' read-only height x width uint32 gid grid, backed by memory map '''
+        offset, height, width = self.meta['grids'][str(layer_id)]
+        return np.frombuffer(self._buffer, dtype='<u4', count=height * width,
+                             offset=self._data_offset + offset).reshape(height, width)
+
+    def get_static_collision(self, options:Optional[dict] = None) -> Optional[list[list[Vector]]]:
+        ''' Returns static collision shapes, None if not compiled or built with other options '''
+        table = self.meta['collision']
+        if table is None: return None
+        if options is not None and options != self.meta['options']: return None
+        counts_offset, shape_count, coords_offset, coords_count = table
+        counts = np.frombuffer(self._buffer, dtype='<u4', count=shape_count,
+                               offset=self._data_offset + counts_offset)
+        coords = np.frombuffer(self._buffer, dtype='<f8', count=coords_count,
+                               offset=self._data_offset + coords_offset)
+        return unpack_shapes(counts, coords)
+
+    def get_tileset_paths(self) -> dict[int, Path]:
+        ''' paths of external tileset files by firstgid '''
+        parent_dir = self.map_file.parent
+        return {raw_tileset['firstgid'] : Path(parent_dir / raw_tileset['source'])
+                for raw_tileset in self.meta['map']['tilesets'] if raw_tileset.get('source') is not None}
+
+    def build_tiled_map(self) -> pytiled_parser.TiledMap:
+        '''
+        Build pytiled_parser map from meta, tile grids from memory map.
+        Tilesets and object layers are parsed with pytiled_parser as before(they are small).
+        Same with pytiled_parser.parsers.json.tiled_map.parse except object template tilesets.
+        '''
+        raw_map = self.meta['map']
+        parent_dir = self.map_file.parent
+
+        tilesets = {}
+        tileset_paths = self.get_tileset_paths()
+        for raw_tileset in raw_map['tilesets']:
+            firstgid = raw_tileset['firstgid']
+            if raw_tileset.get('source') is None:
+                tilesets[firstgid] = parse_json_tileset(raw_tileset, firstgid)
+                continue
+            tileset_path = tileset_paths[firstgid]
+            with open(tileset_path) as raw_tileset_file:
+                if check_format(tileset_path) == 'tmx':
+                    tilesets[firstgid] = parse_tmx_tileset(
+                        etree.parse(raw_tileset_file).getroot(), firstgid, external_path=tileset_path.parent)
+                else:
+                    tilesets[firstgid] = parse_json_tileset(
+                        json.load(raw_tileset_file), firstgid, external_path=tileset_path.parent)
+
+        layers = [parse_json_layer(raw_layer, parent_dir) for raw_layer in raw_map['layers']]
+        for layer in _iter_layers(layers):
+            if isinstance(layer, pytiled_parser.TileLayer):
+                layer.data = self.get_grid(layer.id)
+            elif isinstance(layer, pytiled_parser.ObjectLayer):
+                for tiled_object in layer.tiled_objects:
+                    if getattr(tiled_object, 'new_tileset', None) is not None:
+                        raise ValueError('Tilesets of object templates are not supported in compiled map')
+
+        version = raw_map['version']
+        tiled_map = pytiled_parser.TiledMap(
+            map_file=self.map_file,
+            infinite=raw_map['infinite'],
+            layers=layers,
+            map_size=Size(raw_map['width'], raw_map['height']),
+            next_layer_id=raw_map['nextlayerid'],
+            next_object_id=raw_map['nextobjectid'],
+            orientation=raw_map['orientation'],
+            render_order=raw_map['renderorder'],
+            tiled_version=raw_map['tiledversion'],
+            tile_size=Size(raw_map['tilewidth'], raw_map['tileheight']),
+            tilesets=tilesets,
+            version=str(version) if isinstance(version, float) else version,
+        )
+        if raw_map.get('class') is not None:
+            tiled_map.class_ = raw_map['class']
+        if raw_map.get('backgroundcolor') is not None:
+            tiled_map.background_color = parse_color(raw_map['backgroundcolor'])
+        if raw_map.get('hexsidelength') is not None:
+            tiled_map.hex_side_length = raw_map['hexsidelength']
+        if raw_map.get('properties') is not None:
+            tiled_map.properties = parse_properties(raw_map['properties'])
+        if raw_map.get('staggeraxis') is not None:
+            tiled_map.stagger_axis = raw_map['staggeraxis']
+        if raw_map.get('staggerindex') is not None:
+            tiled_map.stagger_index = raw_map['staggerindex']
+        tiled_map.parallax_origin = OrderedPair(raw_map.get('parallaxoriginx', 0), raw_map.get('parallaxoriginy', 0))
+        return tiled_map
+
+
+if __name__ != "__main__":
+    print("include", __name__, ":", __file__)
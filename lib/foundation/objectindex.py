@@ -0,0 +1,154 @@
+'''
+Uniform grid index of Tiled objects
+
+Objects of an object layer are kept with their bounding box, name and class.
+Region queries visit only grid cells overlapping the region, name / class queries
+are dict lookups. Iteration and results keep insertion(map) order.
+
+i.e.
+```
+    index = ObjectIndex(cell_size = 512)
+    index.add(spawner, (0, 0, 32, 32), name = 'spawn', class_ = 'Spawner')
+    index.query((-100, -100, 100, 100), class_ = 'Spawner')
+```
+'''
+from __future__ import annotations
+
+import math
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+Bounds = Tuple[float, float, float, float]
+''' left, bottom, right, top '''
+
+
+def get_bounds(points: Sequence[Sequence[float]]) -> Bounds:
+    ''' bounding box of point(x, y) or points '''
+    if points and not isinstance(points[0], (list, tuple)):
+        x, y = points[0], points[1]
+        return x, y, x, y
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class ObjectIndex:
+    '''
+    Uniform grid spatial index by bounding box, with name and class lookup.
+    Items are compared by identity, same item can not be added twice.
+    '''
+
+    __slots__ = ('cell_size', '_items', '_bounds', '_names', '_classes', '_handles',
+                 '_cells', '_by_name', '_by_class', '_count')
+
+    def __init__(self, cell_size: float = 512.0) -> None:
+        self.cell_size: float = cell_size
+        ''' size of grid cell in world coordinates '''
+        self._items: List[Any] = []
+        ''' items by handle, None if removed '''
+        self._bounds: List[Bounds] = []
+        self._names: List[Optional[str]] = []
+        self._classes: List[Optional[str]] = []
+        self._handles: Dict[int, int] = {}
+        ''' handle by id of item '''
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        ''' handles by grid cell '''
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_class: Dict[str, List[int]] = {}
+        self._count: int = 0
+
+    def _get_cells(self, bounds: Bounds) -> Iterator[Tuple[int, int]]:
+        left, bottom, right, top = bounds
+        size = self.cell_size
+        for cy in range(math.floor(bottom / size), math.floor(top / size) + 1):
+            for cx in range(math.floor(left / size), math.floor(right / size) + 1):
+                yield cx, cy
+
+    def _get_cell_count(self, bounds: Bounds) -> float:
+        left, bottom, right, top = bounds
+        size = self.cell_size
+        if not all(math.isfinite(value) for value in bounds): return math.inf
+        return (math.floor(right / size) - math.floor(left / size) + 1) * (math.floor(top / size) - math.floor(bottom / size) + 1)
+
+    def add(self, item: Any, bounds: Bounds, name: Optional[str] = None, class_: Optional[str] = None) -> None:
+        if id(item) in self._handles: raise ValueError('Item is already in index')
+        handle = len(self._items)
+        self._items.append(item)
+        self._bounds.append(tuple(bounds))
+        self._names.append(name)
+        self._classes.append(class_)
+        self._handles[id(item)] = handle
+        for cell in self._get_cells(bounds):
+            self._cells.setdefault(cell, []).append(handle)
+        if name: self._by_name.setdefault(name, []).append(handle)
+        if class_: self._by_class.setdefault(class_, []).append(handle)
+        self._count += 1
+
+    def remove(self, item: Any) -> None:
+        handle = self._handles.pop(id(item))
+        for cell in self._get_cells(self._bounds[handle]):
+            self._cells[cell].remove(handle)
+        if self._names[handle]: self._by_name[self._names[handle]].remove(handle)
+        if self._classes[handle]: self._by_class[self._classes[handle]].remove(handle)
+        self._items[handle] = None
+        self._count -= 1
+
+    def replace(self, item: Any, new_item: Any) -> None:
+        ''' swap item keeping its bounds, name, class and order '''
+        handle = self._handles.pop(id(item))
+        self._items[handle] = new_item
+        self._handles[id(new_item)] = handle
+
+    def get_bounds(self, item: Any) -> Bounds:
+        return self._bounds[self._handles[id(item)]]
+
+    def query(
+        self,
+        rect: Optional[Bounds] = None,
+        name: Optional[str] = None,
+        class_: Optional[str] = None,
+    ) -> List[Any]:
+        '''
+        Items matching all given conditions, in order of adding.
+
+        rect : (left, bottom, right, top), items whose bounds overlap it
+        name, class_ : exact name / class of item
+        '''
+        candidates: Optional[set] = None
+        if name is not None:
+            candidates = set(self._by_name.get(name, ()))
+        if class_ is not None:
+            handles = self._by_class.get(class_, ())
+            candidates = set(handles) if candidates is None else candidates.intersection(handles)
+        if rect is not None:
+            left, bottom, right, top = rect
+            if candidates is None and self._get_cell_count(rect) > len(self._cells):
+                candidates = set(self._handles.values())    ### large or unbounded rect
+            elif candidates is None:
+                candidates = set()
+                for cell in self._get_cells(rect):
+                    candidates.update(self._cells.get(cell, ()))
+            candidates = {
+                handle for handle in candidates
+                if self._bounds[handle][0] <= right and self._bounds[handle][2] >= left
+                and self._bounds[handle][1] <= top and self._bounds[handle][3] >= bottom
+            }
+        if candidates is None:
+            return list(self)
+        return [self._items[handle] for handle in sorted(candidates)]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        return (item for item in self._items if item is not None)
+
+    def __contains__(self, item: Any) -> bool:
+        return id(item) in self._handles
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+
+if __name__ != "__main__":
+    print("include", __name__, ":", __file__)
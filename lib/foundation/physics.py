@@ -3,9 +3,10 @@ from __future__ import annotations
 (only coupled with pymunk in this file)
 '''
 
-import pickle
 import math
-from typing import Callable, Optional, Union
+import heapq
+from collections import deque
+from typing import Callable, Iterator, KeysView, Optional, Union
 
 import pymunk, pymunk.util
 
@@ -84,7 +85,6 @@ def _combine_n_reduce(shape_a:list, shape_b:list):
     '''
     첫 점과 끝 점이 포함되어 있으면 순서가 꼬이기 때문에 미리 알아둔다.
     '''
-    for_debug = _reduce_points(shape_b)
 
     if inter_num > 2:       ### reduce intersec to each edge
         if intersec[0] == shape_a[0]:
@@ -132,24 +132,55 @@ def _combine_n_reduce(shape_a:list, shape_b:list):
     
     return rest_a + rest_b
 
-def _reduce_shapes(shapes:list):
-    count = len(shapes)
-    if count < 2:
-        return shapes, False
-    
-    for ia in range(count - 1):
-        for ib in range(ia + 1, count):
-            reduction = _combine_n_reduce(shapes[ia], shapes[ib])
-            if reduction != None:
-                # they can so return a new list of hulls and a True
-                new_hulls = [reduction]
-                for j in range(count):
-                    if not (j in (ia, ib)):
-                        new_hulls.append(shapes[j])
-                return new_hulls, True
-
-    # nothing was reduced, send the original hull list back with a False
-    return shapes, False
+def _reduce_shapes(shapes:list) -> list:
+    '''
+    Merge hulls until no pair can be merged.
+
+    Same result with merging the first mergeable pair (in list order) and
+    restarting with [merged] + rest, but without all-pairs scan:
+    - hulls sharing less than 2 points never merge, partners are found by hash of points
+    - merged hull goes in front of all, so order of the other hulls never changes and
+      a pair which failed once fails forever. Each pair is tried once, in work queue order.
+    '''
+    if len(shapes) < 2: return shapes
+
+    hulls:dict[int, list] = dict(enumerate(shapes))
+    ''' hull by order key, merged hulls get smaller keys than all '''
+    owners:dict[tuple, set[int]] = {}
+    ''' keys of hulls having the point '''
+    for key, hull in hulls.items():
+        for point in hull:
+            owners.setdefault(tuple(point), set()).add(key)
+
+    queue = list(hulls)     ### sorted, a heap already
+    next_key = -1
+    while queue:
+        key_a = heapq.heappop(queue)
+        shape_a = hulls.get(key_a)
+        if shape_a is None: continue
+
+        shared:dict[int, int] = {}
+        for point in shape_a:
+            for key_b in owners[tuple(point)]:
+                if key_b > key_a: shared[key_b] = shared.get(key_b, 0) + 1
+
+        for key_b in sorted(key_b for key_b, count in shared.items() if count > 1):
+            shape_b = hulls[key_b]
+            reduction = _combine_n_reduce(shape_a, shape_b)
+            if reduction is None: continue
+
+            for key, hull in ((key_a, shape_a), (key_b, shape_b)):
+                del hulls[key]
+                for point in hull:
+                    owners[tuple(point)].discard(key)
+            hulls[next_key] = reduction
+            for point in reduction:
+                owners.setdefault(tuple(point), set()).add(next_key)
+            heapq.heappush(queue, next_key)
+            next_key -= 1
+            break
+
+    return [hulls[key] for key in sorted(hulls)]
 
 def triangulate_all(shapes:list) -> list:
     triangles = []
@@ -170,13 +201,7 @@ def get_convexes(shapes) -> list:
 
     
     # hulls = shapes[:]
-    hulls = triangulate_all(shapes)
-    reducing = True
-    n = 0
-    # keep trying to reduce until it won't reduce any more
-    while reducing:
-        hulls, reducing = _reduce_shapes(hulls)
-        n += 1
+    hulls = _reduce_shapes(triangulate_all(shapes))
     new_hulls = []
     for hull in hulls:
         new_hulls.append(_reduce_points(hull))
@@ -215,14 +240,241 @@ def get_owner(
     
     return None
 
-def get_merged_convexes(sprite_list):
-    ''' Returns merged convexes from sprite list '''
-    walls_points:list = []
-    for sprite in tqdm(sprite_list):
-        sprite:Sprite
-        walls_points.append(sprite.get_adjusted_hit_box())
+def get_merged_rects(cells:set[tuple[int, int]]) -> list[tuple[int, int, int, int]]:
+    '''
+    Cover grid cells with maximal rectangles, greedy.
+    Each rectangle grows along the row first, then over next rows while the whole span is free.
     
-    return get_convexes(walls_points)
+    cells : (col, row) of filled cells
+    Returns list of (col, row, width, height)
+    '''
+    free = set(cells)
+    rects = []
+    for col, row in sorted(cells, key=lambda cell: (cell[1], cell[0])):
+        if (col, row) not in free: continue
+        width = 1
+        while (col + width, row) in free:
+            width += 1
+        height = 1
+        while all((c, row + height) in free for c in range(col, col + width)):
+            height += 1
+        for r in range(row, row + height):
+            for c in range(col, col + width):
+                free.discard((c, r))
+        rects.append((col, row, width, height))
+    return rects
+
+def _get_full_cell_key(sprite:Sprite, hit_box) -> Optional[tuple]:
+    ''' (cell size and phase, col, row) if hit box is the whole rectangle of sprite, else None '''
+    width, height = sprite.width, sprite.height
+    if not width or not height: return None
+    left, bottom = sprite.center_x - width / 2, sprite.center_y - height / 2
+    corners = {(round(left, 3), round(bottom, 3)), (round(left + width, 3), round(bottom, 3)),
+               (round(left + width, 3), round(bottom + height, 3)), (round(left, 3), round(bottom + height, 3))}
+    if {(round(x, 3), round(y, 3)) for x, y in hit_box} != corners: return None
+    col, row = math.floor(left / width + 0.5), math.floor(bottom / height + 0.5)
+    grid = (round(width, 3), round(height, 3), round(left - col * width, 3), round(bottom - row * height, 3))
+    return grid, col, row
+
+def merge_full_cell_hit_boxes(sprites) -> tuple[list, list]:
+    '''
+    Merge hit boxes filling whole sprite rectangle(grid aligned wall tiles) into maximal rectangles.
+    Returns (rectangle shapes, other hit boxes for get_convexes)
+    '''
+    grids:dict[tuple, set] = {}
+    others = []
+    for sprite in sprites:
+        sprite:Sprite
+        hit_box = sprite.get_adjusted_hit_box()
+        key = _get_full_cell_key(sprite, hit_box)
+        if key is None:
+            others.append(hit_box)
+        else:
+            grids.setdefault(key[0], set()).add(key[1:])
+    
+    rects = []
+    for (width, height, phase_x, phase_y), cells in grids.items():
+        for col, row, cols, rows in get_merged_rects(cells):
+            left, bottom = col * width + phase_x, row * height + phase_y
+            right, top = left + cols * width, bottom + rows * height
+            rects.append([(left, bottom), (right, bottom), (right, top), (left, top)])
+    return rects, others
+
+def _cross(o, a, b) -> float:
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+def _get_signed_area(points:list) -> float:
+    return sum(_cross((0, 0), points[i - 1], points[i]) for i in range(len(points))) / 2
+
+def _is_convex(points:list, eps:float) -> bool:
+    count = len(points)
+    return all(_cross(points[i - 1], points[i], points[(i + 1) % count]) >= -eps for i in range(count))
+
+def _remove_collinear_points(points:list, eps:float) -> list:
+    count = len(points)
+    return [points[i] for i in range(count)
+            if abs(_cross(points[i - 1], points[i], points[(i + 1) % count])) > eps]
+
+def _get_convex_pieces(shape, eps:float) -> list[list[tuple]]:
+    ''' anticlockwise convex pieces of a shape, the shape itself if convex '''
+    points = []
+    for x, y in shape:
+        point = (round(x, 6), round(y, 6))
+        if not points or points[-1] != point: points.append(point)
+    if len(points) > 1 and points[0] == points[-1]: points.pop()
+    if len(points) < 3: return []
+    area = _get_signed_area(points)
+    if abs(area) <= eps: return []
+    if area < 0: points.reverse()
+    if _is_convex(points, eps): return [points]
+
+    pieces = []
+    for piece in pymunk.util.convexise(pymunk.util.triangulate(points)):
+        piece = [(round(x, 6), round(y, 6)) for x, y in piece]
+        if _get_signed_area(piece) < 0: piece.reverse()
+        pieces.append(piece)
+    return pieces
+
+def _split_t_junctions(pieces:list[list[tuple]], tolerance:float) -> list[list[tuple]]:
+    '''
+    Insert points of other pieces lying on edges,
+    so touching pieces share exactly same edges(i.e. a 2 cell rectangle next to two 1 cell squares)
+    '''
+    edge_lengths = [math.dist(piece[i - 1], piece[i]) for piece in pieces for i in range(len(piece))]
+    grid_size = max(sum(edge_lengths) / len(edge_lengths), tolerance * 1000)
+    grid:dict[tuple, set] = {}
+    for piece in pieces:
+        for x, y in piece:
+            grid.setdefault((math.floor(x / grid_size), math.floor(y / grid_size)), set()).add((x, y))
+
+    splitted = []
+    for piece in pieces:
+        new_piece = []
+        for i in range(len(piece)):
+            p, q = piece[i - 1], piece[i]
+            length = math.dist(p, q)
+            on_edge = []
+            for cx in range(math.floor(min(p[0], q[0]) / grid_size), math.floor(max(p[0], q[0]) / grid_size) + 1):
+                for cy in range(math.floor(min(p[1], q[1]) / grid_size), math.floor(max(p[1], q[1]) / grid_size) + 1):
+                    for r in grid.get((cx, cy), ()):
+                        if r == p or r == q: continue
+                        if abs(_cross(p, q, r)) > tolerance * length: continue
+                        projection = ((r[0] - p[0]) * (q[0] - p[0]) + (r[1] - p[1]) * (q[1] - p[1])) / length
+                        if tolerance < projection < length - tolerance:
+                            on_edge.append((projection, r))
+            new_piece.extend(r for _, r in sorted(on_edge))
+            new_piece.append(q)
+        splitted.append(new_piece)
+    return splitted
+
+def _merge_pieces(edges:dict, key_a:int, shape_a:list, key_b:int, shape_b:list, index:int) -> Optional[list]:
+    '''
+    Union of two convex pieces sharing edge shape_a[index] -> shape_a[index + 1](reversed in shape_b).
+    The whole shared chain is removed. None if they share more than a chain.
+    '''
+    count = len(shape_a)
+    shared = lambda i: edges.get((shape_a[(i + 1) % count], shape_a[i % count])) == key_b
+    start, end = index, index + 1
+    while shared(start - 1) and end - start < count:
+        start -= 1
+    while shared(end) and end - start < count:
+        end += 1
+    if end - start >= count: return None
+
+    merged = [shape_a[i % count] for i in range(end, start + count + 1)]
+    b_count = len(shape_b)
+    b_index = shape_b.index(shape_a[start % count])
+    end_point = shape_a[end % count]
+    for i in range(b_index + 1, b_index + b_count):
+        point = shape_b[i % b_count]
+        if point == end_point: break
+        merged.append(point)
+    if len(set(merged)) != len(merged): return None
+    return merged
+
+def get_partitioned_convexes(shapes) -> list:
+    '''
+    Union touching shapes and partition them into few convex polygons.
+
+    Greedy diagonal removal(Hertel-Mehlhorn) over convex pieces of shapes:
+    neighbour pieces sharing an edge are merged while the union stays convex, through a work queue.
+    Pieces left can't merge with any neighbour. Collinear points are removed at the end.
+
+    shapes : list of shapes(list of points)
+    Returns anticlockwise convex polygons
+    '''
+    if not shapes: return []
+    xs = [x for shape in shapes for x, _ in shape]
+    ys = [y for shape in shapes for _, y in shape]
+    span = max(max(xs) - min(xs), max(ys) - min(ys), 1.0)
+    tolerance = span * 1e-9
+    eps = span * span * 1e-12
+
+    pieces = [piece for shape in shapes for piece in _get_convex_pieces(shape, eps)]
+    if not pieces: return []
+    pieces = _split_t_junctions(pieces, tolerance)
+
+    hulls:dict[int, list] = dict(enumerate(pieces))
+    edges:dict[tuple, int] = {}
+    ''' owner key by directed edge '''
+    for key, hull in hulls.items():
+        for i in range(len(hull)):
+            edges[(hull[i - 1], hull[i])] = key
+
+    queue = deque(hulls)
+    next_key = len(hulls)
+    while queue:
+        key_a = queue.popleft()
+        shape_a = hulls.get(key_a)
+        if shape_a is None: continue
+
+        for i in range(len(shape_a)):
+            p, q = shape_a[i], shape_a[(i + 1) % len(shape_a)]
+            key_b = edges.get((q, p))
+            if key_b is None or key_b == key_a: continue
+            shape_b = hulls[key_b]
+            merged = _merge_pieces(edges, key_a, shape_a, key_b, shape_b, i)
+            if merged is None or not _is_convex(merged, eps): continue
+
+            for key, hull in ((key_a, shape_a), (key_b, shape_b)):
+                del hulls[key]
+                for j in range(len(hull)):
+                    if edges.get((hull[j - 1], hull[j])) == key: del edges[(hull[j - 1], hull[j])]
+            hulls[next_key] = merged
+            for j in range(len(merged)):
+                edges[(merged[j - 1], merged[j])] = next_key
+            queue.append(next_key)
+            next_key += 1
+            break
+
+    convexes = []
+    for key in sorted(hulls):
+        points = _remove_collinear_points(hulls[key], eps)
+        if len(points) > 2: convexes.append(points)
+    return convexes
+
+def get_shape_stats(shapes:list) -> tuple[int, int]:
+    ''' (shape count, vertex count) of shape data '''
+    return len(shapes), sum(len(shape) for shape in shapes)
+
+CONVEX_MODES = ('merge', 'partition')
+'''
+merge : get_convexes, fast path for full cell rectangles
+partition : get_partitioned_convexes, fewer shapes for physics step
+'''
+
+def merge_convexes(rects:list, hit_boxes:list, mode:str = 'merge') -> list:
+    ''' convexes of rectangles and hit boxes from merge_full_cell_hit_boxes() '''
+    if mode == 'partition': return get_partitioned_convexes(rects + hit_boxes)
+    if mode != 'merge': raise PhysicsException(f'Unknown convex mode {mode}, one of {CONVEX_MODES}')
+    if not hit_boxes: return rects
+    return rects + get_convexes(hit_boxes)
+
+def get_merged_convexes(sprite_list, mode:str = 'merge'):
+    ''' Returns merged convexes from sprite list.
+    Full cell rectangles are merged on grid, only other hit boxes go through get_convexes. '''
+    rects, walls_points = merge_full_cell_hit_boxes(tqdm(sprite_list))
+    return merge_convexes(rects, walls_points, mode)
 
 def setup_shapes(
     body: PhysicsObject,
@@ -557,10 +809,52 @@ class PhysicsObject(pymunk.Body, GameObject):
         return self._shape.collision_type
     
     def _set_collision_type(self, collision_type:int):
-        for shape in self._shape:
+        for shape in self.shapes:
             shape.collision_type = collision_type
+        if isinstance(self.space, PhysicsSpace): self.space._reindex(self)
     
     collision_type = property(_get_collision_type, _set_collision_type)
+    
+    def _set_body_type(self, body_type:pymunk.body._BodyType):
+        pymunk.Body.body_type.fset(self, body_type)
+        if isinstance(self.space, PhysicsSpace): self.space._reindex(self)
+    
+    body_type = property(pymunk.Body.body_type.fget, _set_body_type, doc = pymunk.Body.body_type.__doc__)
+
+
+class CollisionEvent:
+    '''
+    Compact record of a collision callback, queued by deferred collision handlers of PhysicsSpace.
+    Arbiter is not kept because it is valid only inside the callback.
+    '''
+    
+    __slots__ = 'kind', 'types', 'owners', 'point', 'normal', 'impulse', 'count'
+    
+    def __init__(
+        self,
+        kind: str,
+        types: tuple[int, int],
+        owners: tuple,
+        point: Optional[Vector],
+        normal: Vector,
+        impulse: Vector,
+        ) -> None:
+        self.kind = kind
+        ''' 'begin', 'pre', 'post' or 'separate' '''
+        self.types = types
+        ''' collision types of handler '''
+        self.owners = owners
+        ''' top owners of bodies of the shapes, body itself if it has no owner(i.e. static body) '''
+        self.point = point
+        ''' first contact point on first shape, None if no contact(separate) '''
+        self.normal = normal
+        self.impulse = impulse
+        ''' total impulse of post solve, zero for others. Summed if de-duplicated '''
+        self.count = 1
+        ''' count of callbacks merged into this event '''
+    
+    def __repr__(self) -> str:
+        return f'CollisionEvent({self.kind}, {self.types}, {self.owners}, count={self.count})'
 
 
 class PhysicsSpace(pymunk.Space):
@@ -569,6 +863,11 @@ class PhysicsSpace(pymunk.Space):
     
     Be careful with `threaded` option. 
     Will not use for release build because not so effective for its own risk.
+    
+    With `fixed_step`, tick() accumulates frame time and steps the space in fixed substeps
+    (at most `max_substeps` per tick, the rest of time is dropped). 
+    `alpha` is the leftover fraction of a step, with `interpolate` sprites are synced
+    between previous and current physics states by it.
     '''
     
     _temp_shapes: set[pymunk.Shape] = set()
@@ -586,6 +885,9 @@ class PhysicsSpace(pymunk.Space):
         threaded: bool = False,
         sleep_time_threshold: float = 5.0,
         idle_speed_threshold: float = 10.0,
+        fixed_step: float = None,
+        max_substeps: int = 5,
+        interpolate: bool = False,
         ) -> None:
         super().__init__(threaded)
         
@@ -597,7 +899,28 @@ class PhysicsSpace(pymunk.Space):
         if damping is not None: self.damping = damping
         
         self._movable_objs: set[PhysicsObject] = set()
-        self._static_objs: set[PhysicsObject] = set()
+        self._bodies_by_type: dict[int, dict[PhysicsObject, None]] = {
+            pymunk.Body.DYNAMIC: {}, pymunk.Body.KINEMATIC: {}, pymunk.Body.STATIC: {},
+        }
+        ''' PhysicsObjects in space by body type, dict as ordered set '''
+        self._bodies_by_collision: dict[int, dict[PhysicsObject, None]] = {}
+        ''' PhysicsObjects in space by collision type, registry of a type is never removed once made '''
+        self._registry_keys: dict[PhysicsObject, tuple[int, int]] = {}
+        ''' (body type, collision type) each PhysicsObject is registered with '''
+        
+        self.fixed_step: Optional[float] = fixed_step
+        ''' seconds of a substep. None steps with delta_time of tick() as is '''
+        self.max_substeps: int = max_substeps
+        ''' limit of substeps per tick against spiral of death '''
+        self.interpolate: bool = interpolate
+        ''' sync sprites between previous and current states by alpha, needs fixed_step '''
+        self._collision_events: dict[Callable, list[CollisionEvent]] = {}
+        ''' queued events of deferred collision handlers, by handler '''
+        self._collision_pairs: dict[tuple, CollisionEvent] = {}
+        ''' queued event by (handler, kind, owners) for de-duplication, shapes of an owner count as one '''
+        self._accumulator: float = 0.0
+        self._previous_states: dict[PhysicsObject, tuple[Vector, float]] = {}
+        ''' position, angle of bodies before the last substep '''
     
     def add(self, *objs: pymunk.space._AddableObjects) -> None:
 
@@ -612,10 +935,8 @@ class PhysicsSpace(pymunk.Space):
             return
         
         for o in objs:
-            if isinstance(o, PhysicsObject) and o.body_type in (pymunk.Body.DYNAMIC, pymunk.Body.KINEMATIC):
-                self._movable_objs.add(o)
-            if isinstance(o, PhysicsObject) and o.body_type == pymunk.Body.STATIC:
-                self._static_objs.add(o)
+            if isinstance(o, PhysicsObject):
+                self._register(o)
             if isinstance(o, pymunk.Shape):
                 PhysicsSpace._temp_shapes.discard(o)
         
@@ -630,11 +951,46 @@ class PhysicsSpace(pymunk.Space):
         
         for o in objs:
             if isinstance(o, PhysicsObject):
-                self._movable_objs.discard(o)
-                self._static_objs.discard(o)
+                self._unregister(o)
         
         return super().remove(*objs)
     
+    def _register(self, o: PhysicsObject) -> None:
+        if o in self._registry_keys: self._unregister(o)
+        body_type, collision_type = keys = o.body_type, o.collision_type
+        self._registry_keys[o] = keys
+        self._bodies_by_type[body_type][o] = None
+        self._bodies_by_collision.setdefault(collision_type, {})[o] = None
+        if body_type != pymunk.Body.STATIC: self._movable_objs.add(o)
+    
+    def _unregister(self, o: PhysicsObject) -> None:
+        keys = self._registry_keys.pop(o, None)
+        if keys is None: return
+        body_type, collision_type = keys
+        self._bodies_by_type[body_type].pop(o, None)
+        self._bodies_by_collision[collision_type].pop(o, None)     ### kept even if empty, views of it stay live
+        self._movable_objs.discard(o)
+    
+    def _reindex(self, o: PhysicsObject) -> None:
+        ''' update registries after body type or collision type of object in space changed '''
+        if o in self._registry_keys: self._register(o)
+    
+    def get_bodies(self, body_type: int) -> KeysView[PhysicsObject]:
+        ''' 
+        Live read-only view of PhysicsObjects of body type in space, in order of adding.
+        Do not add or remove bodies while iterating it.
+        '''
+        return self._bodies_by_type[body_type].keys()
+    
+    def get_bodies_by_collision(self, collision_type: int) -> KeysView[PhysicsObject]:
+        ''' Live read-only view of PhysicsObjects of exactly the collision type, see get_bodies() '''
+        return self._bodies_by_collision.setdefault(collision_type, {}).keys()
+    
+    def iter_bodies_by_collision(self, collision_flags: int) -> Iterator[PhysicsObject]:
+        ''' PhysicsObjects whose collision type shares any flag with collision_flags, i.e. `collision.enemy | collision.debris` '''
+        for collision_type, bodies in self._bodies_by_collision.items():
+            if collision_type & collision_flags: yield from bodies
+    
     def add_static_collison(
         self, 
         shape_data,
@@ -645,11 +1001,6 @@ class PhysicsSpace(pymunk.Space):
         ) -> None:
         print('world static collision building')
         
-        # with open('data/static_collision.data', 'rb') as f:
-        #     a = pickle.load(f, )
-        #     self.add(*a)
-        #     return a
-        
         # walls_points:list = []
         # for sprite in tqdm(sprite_list):
         #     sprite:Sprite
@@ -665,9 +1016,6 @@ class PhysicsSpace(pymunk.Space):
             elasticity = elasticity,
             )
         
-        # with open('data/static_collision.data', 'wb') as f:
-            # pickle.dump(shapes, f)
-                
         self.add(*shapes)
         return shapes
     
@@ -692,7 +1040,9 @@ class PhysicsSpace(pymunk.Space):
         begin_handler:Callable = None,
         pre_handler:Callable = None, 
         post_handler:Callable = None,
-        separate_handler:Callable = None
+        separate_handler:Callable = None,
+        deferred:bool = False,
+        dedupe:bool = False,
         ) -> None:
         """ Add code to handle collisions between objects.
         
@@ -711,8 +1061,21 @@ class PhysicsSpace(pymunk.Space):
         Note #2: `pre_solve()` callbacks are called before the sleeping algorithm
         runs. If an object falls asleep, its `post_solve()` callback won't be
         called until it's re-awoken.
+        
+        With `deferred`, callbacks only queue CollisionEvents during step and
+        handlers are called as `handler(events: list[CollisionEvent])` by 
+        dispatch_collision_events() after stepping(tick() does it), once per handler.
+        Space can be modified safely in them, but collisions can not be rejected 
+        by return value. With `dedupe`, same kind of events of a pair of owners are merged
+        into one per dispatch, whichever shapes of them touched.
         """
         
+        if deferred:
+            return self._add_deferred_collision_handler(
+                first_type, second_type, dedupe,
+                begin = begin_handler, pre = pre_handler, post = post_handler, separate = separate_handler,
+            )
+        
         def handler_begin(arbiter, space, data):
             shape1, shape2 = self.get_owners_from_arbiter(arbiter)
             should_process_collision = begin_handler(shape1, shape2, arbiter, space, data)
@@ -742,6 +1105,52 @@ class PhysicsSpace(pymunk.Space):
         if separate_handler:
             h.separate = handler_separate
     
+    def _add_deferred_collision_handler(self, first_type:int, second_type:int, dedupe:bool, **handlers:Callable) -> None:
+        types = first_type, second_type
+        
+        def get_recorder(kind:str, handler:Callable) -> Callable:
+            def record(arbiter, space, data):
+                self._queue_collision_event(handler, kind, types, arbiter, dedupe)
+                return True
+            return record
+        
+        h = super().add_collision_handler(first_type, second_type)
+        for kind, callback in (('begin', 'begin'), ('pre', 'pre_solve'), ('post', 'post_solve'), ('separate', 'separate')):
+            if handlers[kind]: setattr(h, callback, get_recorder(kind, handlers[kind]))
+    
+    def _queue_collision_event(self, handler:Callable, kind:str, types:tuple[int, int], arbiter:pymunk.Arbiter, dedupe:bool) -> None:
+        owners = tuple(self._get_collision_owner(shape) for shape in arbiter.shapes)
+        impulse = arbiter.total_impulse if kind == 'post' else pymunk.Vec2d.zero()
+        if dedupe:
+            key = handler, kind, *owners
+            event = self._collision_pairs.get(key)
+            if event is not None:
+                event.count += 1
+                event.impulse += impulse
+                return
+        
+        contacts = arbiter.contact_point_set
+        point = contacts.points[0].point_a if contacts.points else None
+        event = CollisionEvent(kind, types, owners, point, contacts.normal, impulse)
+        if dedupe: self._collision_pairs[key] = event
+        self._collision_events.setdefault(handler, []).append(event)
+    
+    @staticmethod
+    def _get_collision_owner(shape:pymunk.Shape) -> Union[GameObject, pymunk.Body]:
+        ''' top owner of body of shape. Bodies without owner(i.e. static body of walls) stand in for it '''
+        body = shape.body
+        return body.owner if isinstance(body, GameObject) else body
+    
+    def dispatch_collision_events(self) -> int:
+        ''' Call deferred collision handlers with their queued events. Returns count of events dispatched. '''
+        if not self._collision_events: return 0
+        events_by_handler = self._collision_events
+        self._collision_events = {}         ### handlers may step or add events
+        self._collision_pairs = {}
+        for handler, events in events_by_handler.items():
+            handler(events)
+        return sum(len(events) for events in events_by_handler.values())
+    
     def activate_objects(self):
         for o in self._movable_objs:
             o.activate()
@@ -771,47 +1180,97 @@ class PhysicsSpace(pymunk.Space):
             line_color=line_color,
             line_thickness=line_thickness,
             fill_color=fill_color)
-        for o in self._static_objs:
+        for o in self._bodies_by_type[pymunk.Body.STATIC]:
             o.draw(
                 line_color=line_color,
                 line_thickness=line_thickness,
                 fill_color=fill_color
             )
     
-    def sync(self):
+    def sync(self) -> int:
         '''
         이동 가능한 대상만 싱크해야 하므로 일단은 여기서 하는 것으로 유지.
         만약 _movable_objs를 유지하지 않을 경우 DynamicBody부터 tick에서 sync를 하도록 변경.
+        
+        Positions and angles of awake bodies are read in one pass,
+        then written to sprites in bulk by engine.body.sync_physics_bodies(). Returns count of synced bodies.
         '''
-        for o in self._movable_objs:
-            if o.spawnned: o._owner._sync()        ### Not so robust method
-            
-    def tick(self, delta_time: float, sync: bool = True):
-        # for _ in range(5):
-        #     self.step(1/300)
+        from .engine.body import sync_physics_bodies    ### engine.body imports this module
         
-        self.step(delta_time)
+        objs = [o for o in self._movable_objs if o.spawnned and not o.is_sleeping]
+        if not objs: return 0
+        positions = [o.position for o in objs]
+        angles = [o.angle for o in objs]
+        if self.interpolate and self._previous_states:
+            self._interpolate_states(objs, positions, angles)
+        angles = np.degrees(angles).tolist()
+        return sync_physics_bodies([o._owner for o in objs], positions, angles)     ### Not so robust method
+    
+    def _interpolate_states(self, objs: list[PhysicsObject], positions: list, angles: list[float]) -> None:
+        ''' blend positions and angles in place from previous states by alpha '''
+        alpha = self.alpha
+        previous_states = self._previous_states
+        for i, o in enumerate(objs):
+            state = previous_states.get(o)
+            if state is None: continue
+            (px, py), pa = state
+            x, y = positions[i]
+            positions[i] = pymunk.Vec2d(px + (x - px) * alpha, py + (y - py) * alpha)
+            angles[i] = pa + (angles[i] - pa) * alpha
+    
+    @property
+    def alpha(self) -> float:
+        ''' leftover fraction of fixed step after tick, 0.0 ~ 1.0. 1.0 without fixed_step '''
+        if not self.fixed_step: return 1.0
+        return min(self._accumulator / self.fixed_step, 1.0)
+    
+    def tick(self, delta_time: float, sync: bool = True) -> int:
+        '''
+        Step the space by delta_time, then sync sprites. Returns count of steps taken.
+        
+        With fixed_step, frame time is accumulated and consumed by fixed substeps.
+        Sync is done once after the last substep, even if no substep was taken(alpha moved).
+        Events of deferred collision handlers are dispatched before sync.
+        '''
+        if not self.fixed_step:
+            self.step(delta_time)
+            self.dispatch_collision_events()
+            if sync: self.sync()
+            return 1
+        
+        self._accumulator += delta_time
+        steps = int(self._accumulator // self.fixed_step)
+        if steps > self.max_substeps:
+            steps = self.max_substeps
+            self._accumulator = steps * self.fixed_step + self._accumulator % self.fixed_step
+        
+        for i in range(steps):
+            if self.interpolate and i == steps - 1:
+                self._previous_states = {o: (o.position, o.angle) for o in self._movable_objs 
+                                         if o.spawnned and not o.is_sleeping}
+            self.step(self.fixed_step)
+        self._accumulator -= steps * self.fixed_step
+        
+        self.dispatch_collision_events()
         if sync: self.sync()
+        return steps
     
     @property
     def movables(self) -> list[GameObject]:
-        ''' Returns GameObjects which have DYNAMIC body. Fast, recommended for use. '''
+        ''' Returns GameObjects which have DYNAMIC or KINEMATIC body. Fast, recommended for use. '''
         return [o.owner for o in self._movable_objs]
     
     @property
     def dynamics(self) -> list[GameObject]:
-        ''' Returns GameObjects which have DYNAMIC body. '''
-        return [o.owner for o in self._movable_objs if o.body_type == pymunk.Body.DYNAMIC]
+        ''' Returns GameObjects which have DYNAMIC body. For bodies without list, use get_bodies() '''
+        return [o.owner for o in self._bodies_by_type[pymunk.Body.DYNAMIC]]
     
     @property
     def statics(self) -> list[GameObject]:
-        ''' Returns GameObjects which have STATIC body. 
-        
-        Not recommended to use frequently
-        '''
-        return [o.owner for o in self.bodies if o.body_type == pymunk.Body.STATIC and hasattr(o, 'owner')]
+        ''' Returns GameObjects which have STATIC body. For bodies without list, use get_bodies() '''
+        return [o.owner for o in self._bodies_by_type[pymunk.Body.STATIC]]
     
     @property
     def kinematics(self) -> list[GameObject]:
-        ''' Returns GameObjects which have KINEMATIC body. '''
-        return [o.owner for o in self._movable_objs if o.body_type == pymunk.Body.KINEMATIC]
+        ''' Returns GameObjects which have KINEMATIC body. For bodies without list, use get_bodies() '''
+        return [o.owner for o in self._bodies_by_type[pymunk.Body.KINEMATIC]]
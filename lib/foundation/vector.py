@@ -4,8 +4,13 @@ by joonhyuk@me.com
 
 forked from https://gist.github.com/mcleonard/5351452
 """
+from __future__ import annotations
+
 import math
 from typing import Iterable
+from contextlib import contextmanager
+
+import numpy as np
 
 def _check_valid_iterable(other) -> bool:
     if isinstance(other, Vector):
@@ -22,6 +27,8 @@ class Vector(tuple):
     __slots__ = ()
     
     def __new__(cls, *args):
+        if len(args) == 2:      ### 2D fast path, most common case
+            return tuple.__new__(cls, args)
         if not args:
             args = (0, 0)
         elif len(args) == 1:
@@ -32,7 +39,7 @@ class Vector(tuple):
     
     def norm(self):
         """ Returns the norm (length, magnitude) of the vector """
-        return math.sqrt(sum( x*x for x in self ))
+        return math.hypot(*self)
         
     def argument(self, origin=None, radians=False):
         """ Returns the argument of the vector, the angle clockwise from +x. In degress by default, 
@@ -54,7 +61,12 @@ class Vector(tuple):
         """ Returns the argument of the vector, with degrees, origin of (1, 0), clockwise
         
         For slightly better performance than argument() """
-        norm = math.sqrt(sum( x*x for x in self ))
+        if len(self) == 2:
+            x, y = self
+            if not x and not y: return 0
+            angle = math.degrees(math.atan2(y, x))
+            return angle + 360 if angle < 0 else angle
+        norm = math.hypot(*self)
         if not norm: return 0
         angle = math.degrees(math.acos(vectors.right * self/norm))
         if self[1] < 0:
@@ -64,9 +76,11 @@ class Vector(tuple):
     
     def normalize(self):
         """ Returns a normalized unit vector """
-        norm = self.norm()
+        norm = math.hypot(*self)
         if norm == 1.0: return self
         if norm == 0.0: return self.__class__(0.,0.)
+        if len(self) == 2:
+            return tuple.__new__(self.__class__, (self[0] / norm, self[1] / norm))
         normed = tuple( x / norm for x in self )
         return self.__class__(*normed)
     
@@ -126,6 +140,8 @@ class Vector(tuple):
     def inner(self, other):
         """ Returns the dot product (inner product) of self and another vector
         """
+        if len(self) == 2 and isinstance(other, tuple) and len(other) == 2:
+            return self[0] * other[0] + self[1] * other[1]
         if not _check_valid_iterable(other):
             raise ValueError('The dot product requires another vector')
         return sum(a * b for a, b in zip(self, other))
@@ -138,6 +154,16 @@ class Vector(tuple):
             by another Vector.  If multiplied by an int or float,
             multiplies each component by other.
         """
+        if len(self) == 2:
+            if isinstance(other, (int, float)):
+                return tuple.__new__(self.__class__, (self[0] * other, self[1] * other))
+            if isinstance(other, tuple) and len(other) == 2:
+                return self[0] * other[0] + self[1] * other[1]
+        return self._mul_nd(other)
+    
+    def _mul_nd(self, other):
+        """ Generic path of __mul__ for any dimension """
+        if isinstance(other, VectorArray): return NotImplemented
         if _check_valid_iterable(other):
             return self.inner(other)
         elif isinstance(other, (int, float)):
@@ -154,9 +180,21 @@ class Vector(tuple):
         return self.__mul__(other)
     
     def __neg__(self):
+        if len(self) == 2:
+            return tuple.__new__(self.__class__, (-self[0], -self[1]))
         return self.__mul__(-1)
     
     def __truediv__(self, other):
+        if len(self) == 2:
+            if isinstance(other, (int, float)):
+                return tuple.__new__(self.__class__, (self[0] / other, self[1] / other))
+            if isinstance(other, tuple) and len(other) == 2:
+                return tuple.__new__(self.__class__, (self[0] / other[0], self[1] / other[1]))
+        return self._truediv_nd(other)
+    
+    def _truediv_nd(self, other):
+        """ Generic path of __truediv__ for any dimension """
+        if isinstance(other, VectorArray): return NotImplemented
         if _check_valid_iterable(other):
             divided = tuple( a / b for a, b in zip(self, other))
         elif isinstance(other, (int, float)):
@@ -185,6 +223,16 @@ class Vector(tuple):
 
     def __add__(self, other):
         """ Returns the vector addition of self and other """
+        if len(self) == 2:
+            if isinstance(other, tuple) and len(other) == 2:
+                return tuple.__new__(self.__class__, (self[0] + other[0], self[1] + other[1]))
+            if isinstance(other, (int, float)):
+                return tuple.__new__(self.__class__, (self[0] + other, self[1] + other))
+        return self._add_nd(other)
+    
+    def _add_nd(self, other):
+        """ Generic path of __add__ for any dimension """
+        if isinstance(other, VectorArray): return NotImplemented
         if _check_valid_iterable(other):
             added = tuple( a + b for a, b in zip(self, other) )
         elif isinstance(other, (int, float)):
@@ -203,6 +251,16 @@ class Vector(tuple):
     def __sub__(self, other):
         """ Returns the vector difference of self and other """
         if other is None: return self
+        if len(self) == 2:
+            if isinstance(other, tuple) and len(other) == 2:
+                return tuple.__new__(self.__class__, (self[0] - other[0], self[1] - other[1]))
+            if isinstance(other, (int, float)):
+                return tuple.__new__(self.__class__, (self[0] - other, self[1] - other))
+        return self._sub_nd(other)
+    
+    def _sub_nd(self, other):
+        """ Generic path of __sub__ for any dimension """
+        if isinstance(other, VectorArray): return NotImplemented
         if _check_valid_iterable(other):
             subbed = tuple( a - b for a, b in zip(self, other) )
         elif isinstance(other, (int, float)):
@@ -220,6 +278,8 @@ class Vector(tuple):
         return self.__sub__(other)
 
     def __eq__(self, other):
+        if len(self) == 2 and isinstance(other, tuple) and len(other) == 2:
+            return self[0] == other[0] and self[1] == other[1]
         if _check_valid_iterable(other):
             return all(a == b for a, b in zip(self, other))
         else:
@@ -275,13 +335,19 @@ class Vector(tuple):
         return self.clamp_min(self.clamp_max(max), min)
     
     def clamp_length(self, max_length:float = 1.0):
-        norm = self.norm()
+        norm = math.hypot(*self)
         if norm <= max_length: return self
+        if len(self) == 2:
+            ratio = max_length / norm
+            return tuple.__new__(self.__class__, (self[0] * ratio, self[1] * ratio))
         clamped = tuple( x * max_length / norm for x in self )
         return self.__class__(*clamped)
     
     def is_close(self, other, precision = 0.001):
         ''' check if nearly equality '''
+        if len(self) == 2 and isinstance(other, tuple) and len(other) == 2:
+            return (math.isclose(self[0], other[0], abs_tol = precision) 
+                    and math.isclose(self[1], other[1], abs_tol = precision))
         if self == other: return True
         if not _check_valid_iterable(other):
             raise ValueError('nearly_equal requires another vector')
@@ -313,13 +379,13 @@ class Vector(tuple):
     
     # @property
     def near_zero(self, precision = 0.01) -> bool:
-        length = math.sqrt(sum( x*x for x in self ))
+        length = math.hypot(*self)
         if not length : return True
         return math.isclose(length, 0, abs_tol = precision)
     
     @property
     def length(self):
-        return math.sqrt(sum( x*x for x in self ))
+        return math.hypot(*self)
     
     @property
     def x(self):
@@ -343,6 +409,368 @@ class Vector(tuple):
             return None
 
 
+class MutableVector:
+    """ In-place 2D accumulator for per tick integration
+
+    Every method modifies itself and returns self for chaining, so a chain of
+    operations makes no intermediate Vector. Freeze into Vector only at API boundaries.
+
+    i.e.
+    ```
+        acc = MutableVector(*move_input).normalize_inplace().scale(accel * delta_time)
+        velocity = acc.iadd(velocity).clamp_length_inplace(max_speed).freeze()
+    ```
+    """
+
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x:float = 0.0, y:float = 0.0) -> None:
+        self.x = x
+        self.y = y
+
+    @classmethod
+    def from_vector(cls, other) -> MutableVector:
+        return cls(other[0], other[1])
+
+    def set(self, x:float, y:float) -> MutableVector:
+        self.x = x
+        self.y = y
+        return self
+
+    def assign(self, other) -> MutableVector:
+        ''' copy values from Vector, MutableVector or any 2-sequence '''
+        if isinstance(other, MutableVector):
+            self.x, self.y = other.x, other.y
+        else:
+            self.x, self.y = other[0], other[1]
+        return self
+
+    def iadd(self, other) -> MutableVector:
+        if isinstance(other, MutableVector):
+            self.x += other.x
+            self.y += other.y
+        else:
+            self.x += other[0]
+            self.y += other[1]
+        return self
+
+    def isub(self, other) -> MutableVector:
+        if isinstance(other, MutableVector):
+            self.x -= other.x
+            self.y -= other.y
+        else:
+            self.x -= other[0]
+            self.y -= other[1]
+        return self
+
+    def iadd_scaled(self, other, factor:float) -> MutableVector:
+        ''' self += other * factor, without temporary vector '''
+        if isinstance(other, MutableVector):
+            self.x += other.x * factor
+            self.y += other.y * factor
+        else:
+            self.x += other[0] * factor
+            self.y += other[1] * factor
+        return self
+
+    def scale(self, factor:float) -> MutableVector:
+        self.x *= factor
+        self.y *= factor
+        return self
+
+    def negate(self) -> MutableVector:
+        self.x = -self.x
+        self.y = -self.y
+        return self
+
+    def normalize_inplace(self) -> MutableVector:
+        ''' make unit vector. zero vector stays zero '''
+        norm = math.hypot(self.x, self.y)
+        if norm:
+            self.x /= norm
+            self.y /= norm
+        return self
+
+    def clamp_length_inplace(self, max_length:float = 1.0) -> MutableVector:
+        norm = math.hypot(self.x, self.y)
+        if norm > max_length:
+            ratio = max_length / norm
+            self.x *= ratio
+            self.y *= ratio
+        return self
+
+    def inner(self, other) -> float:
+        if isinstance(other, MutableVector):
+            return self.x * other.x + self.y * other.y
+        return self.x * other[0] + self.y * other[1]
+
+    def norm(self) -> float:
+        return math.hypot(self.x, self.y)
+
+    length = property(norm)
+
+    def freeze(self) -> Vector:
+        ''' returns immutable Vector of current values '''
+        return tuple.__new__(Vector, (self.x, self.y))
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __len__(self) -> int:
+        return 2
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MutableVector):
+            return self.x == other.x and self.y == other.y
+        if isinstance(other, tuple) and len(other) == 2:
+            return self.x == other[0] and self.y == other[1]
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'MutableVector({self.x}, {self.y})'
+
+
+class VectorPool:
+    """ Opt-in pool of reusable scratch MutableVector
+
+    Release acquired vectors after use. In per tick paths use acquire() / release()
+    (or keep a MutableVector per instance), scratch() context makes a generator
+    and context manager per call and is for convenience only.
+
+    i.e.
+    ```
+        acc = VECTOR_POOL.acquire()
+        velocity = acc.assign(velocity).iadd_scaled(input_unit, accel).freeze()
+        VECTOR_POOL.release(acc)
+    ```
+    """
+
+    __slots__ = ('_free', 'max_size')
+
+    def __init__(self, max_size:int = 64) -> None:
+        self._free:list[MutableVector] = []
+        self.max_size = max_size
+
+    def acquire(self, x:float = 0.0, y:float = 0.0) -> MutableVector:
+        if self._free:
+            return self._free.pop().set(x, y)
+        return MutableVector(x, y)
+
+    def release(self, vector:MutableVector) -> None:
+        if len(self._free) < self.max_size:
+            self._free.append(vector)
+
+    @contextmanager
+    def scratch(self, x:float = 0.0, y:float = 0.0):
+        vector = self.acquire(x, y)
+        try:
+            yield vector
+        finally:
+            self.release(vector)
+
+    def __len__(self) -> int:
+        ''' count of free vectors '''
+        return len(self._free)
+
+
+VECTOR_POOL = VectorPool()
+''' shared scratch pool, for main(game) thread only '''
+
+
+def _as_rows(other):
+    """ Returns ndarray broadcastable against N x 2 rows.
+
+    Scalars and (N,) arrays are expanded per row, 2-sequences are shared by all rows.
+    """
+    if isinstance(other, VectorArray):
+        return other.data
+    if isinstance(other, (int, float)):
+        return other
+    other = np.asarray(other, dtype=np.float64)
+    if other.ndim == 1 and other.shape[0] != 2:
+        return other[:, None]
+    return other
+
+
+class VectorArray:
+    """ N x 2 float64 buffer with the operator surface of Vector
+
+    For batch math of crowds, debris, etc. One vectorized call instead of one python op per vector.
+
+    Operands could be VectorArray, N x 2 ndarray, single Vector(shared by all rows),
+    scalar or (N,) array(per row scalar).
+    Same as Vector, `*` with vectors returns dot products, with scalars returns scaled array.
+
+    i.e.
+    ```
+        positions = VectorArray.from_vectors([body.position for body in bodies])
+        positions += velocities * delta_time
+        for body, position in zip(bodies, positions.to_vectors()): ...
+    ```
+    """
+
+    __slots__ = ('data', )
+
+    def __init__(self, data = None) -> None:
+        if data is None:
+            data = np.zeros((0, 2), dtype=np.float64)
+        elif isinstance(data, VectorArray):
+            data = data.data.copy()
+        else:
+            data = np.array(data, dtype=np.float64).reshape(-1, 2)
+        self.data:np.ndarray = data
+        ''' N x 2 buffer. Modify it directly for in-place operations '''
+
+    @classmethod
+    def _wrap(cls, data:np.ndarray) -> VectorArray:
+        ''' wrap ndarray without copy '''
+        new = cls.__new__(cls)
+        new.data = data
+        return new
+
+    @classmethod
+    def zeros(cls, count:int) -> VectorArray:
+        return cls._wrap(np.zeros((count, 2), dtype=np.float64))
+
+    @classmethod
+    def from_vectors(cls, vectors:Iterable) -> VectorArray:
+        """ Make array from list of Vector(or any 2-sequence) """
+        return cls._wrap(np.array(vectors, dtype=np.float64).reshape(-1, 2))
+
+    def to_vectors(self) -> list[Vector]:
+        """ Returns list of Vector """
+        return [tuple.__new__(Vector, row) for row in self.data.tolist()]
+
+    def copy(self) -> VectorArray:
+        return self._wrap(self.data.copy())
+
+    def __array__(self, dtype = None, copy = None):
+        if dtype is None: return self.data
+        return self.data.astype(dtype)
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __iter__(self):
+        return iter(self.to_vectors())
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return tuple.__new__(Vector, self.data[index].tolist())
+        return self._wrap(self.data[index])
+
+    def __setitem__(self, index, value):
+        self.data[index] = value
+
+    def __repr__(self) -> str:
+        return f'VectorArray({self.data.tolist()})'
+
+    def norm(self) -> np.ndarray:
+        """ Returns the norms (length, magnitude) of each vector """
+        return np.hypot(self.data[:, 0], self.data[:, 1])
+
+    length = property(norm)
+
+    def normalize(self) -> VectorArray:
+        """ Returns normalized unit vectors. Zero vectors stay zero """
+        norm = self.norm()
+        norm[norm == 0.0] = 1.0
+        return self._wrap(self.data / norm[:, None])
+
+    unit = property(normalize)
+
+    def rotate(self, theta, radian = False) -> VectorArray:
+        """ Rotate vectors by theta(scalar or (N,) array), in degrees by default """
+        if not radian: theta = np.radians(theta)
+        dc, ds = np.cos(theta), np.sin(theta)
+        x, y = self.data[:, 0], self.data[:, 1]
+        return self._wrap(np.column_stack((dc * x - ds * y, ds * x + dc * y)))
+
+    def clamp_length(self, max_length = 1.0) -> VectorArray:
+        """ Clamp length of each vector. max_length could be scalar or (N,) array """
+        norm = self.norm()
+        ratio = np.ones_like(norm)
+        over = norm > max_length
+        ratio[over] = (np.broadcast_to(max_length, norm.shape)[over]) / norm[over]
+        return self._wrap(self.data * ratio[:, None])
+
+    @property
+    def angle(self) -> np.ndarray:
+        """ Returns the arguments of vectors, with degrees, origin of (1, 0), 0 <= angle < 360 """
+        return np.degrees(np.arctan2(self.data[:, 1], self.data[:, 0])) % 360
+
+    def is_close(self, other, precision = 0.001) -> np.ndarray:
+        """ Returns bool array of nearly equality per vector """
+        return np.all(np.abs(self.data - _as_rows(other)) <= precision, axis=1)
+
+    def inner(self, other) -> np.ndarray:
+        """ Returns dot products per vector """
+        return np.einsum('ij,ij->i', self.data, np.broadcast_to(_as_rows(other), self.data.shape))
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    def __add__(self, other):
+        return self._wrap(self.data + _as_rows(other))
+
+    __radd__ = __add__
+
+    def __iadd__(self, other):
+        self.data += _as_rows(other)
+        return self
+
+    def __sub__(self, other):
+        return self._wrap(self.data - _as_rows(other))
+
+    def __rsub__(self, other):
+        return self._wrap(_as_rows(other) - self.data)
+
+    def __isub__(self, other):
+        self.data -= _as_rows(other)
+        return self
+
+    def __mul__(self, other):
+        """ Returns dot products if multiplied by vectors, else scaled array """
+        if isinstance(other, (int, float)):
+            return self._wrap(self.data * other)
+        other = _as_rows(other)
+        if other.ndim == 2 and other.shape[-1] == 2 or other.ndim == 1:
+            return self.inner(other)
+        return self._wrap(self.data * other)
+
+    __rmul__ = __mul__
+
+    def __imul__(self, other):
+        if isinstance(other, (int, float)):
+            self.data *= other
+            return self
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        return self._wrap(self.data / _as_rows(other))
+
+    def __rtruediv__(self, other):
+        return self._wrap(_as_rows(other) / self.data)
+
+    def __itruediv__(self, other):
+        self.data /= _as_rows(other)
+        return self
+
+    def __neg__(self):
+        return self._wrap(-self.data)
+
+
 class vectors:
     ''' prepare basic vectors '''
     zero = Vector()
@@ -1,9 +1,15 @@
 import copy
-import hashlib
+import json
+import os
+import time
+
+from bisect import bisect_right
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 
 from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, NamedTuple, Sequence, Union, cast
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, NamedTuple, Sequence, Union, cast
 
 import pytiled_parser
 import pytiled_parser.tiled_object
@@ -11,9 +17,12 @@ import pytiled_parser.tiled_object
 
 from pytiled_parser import Properties
 
+import PIL.Image
+
 from arcade import (
     AnimatedTimeBasedSprite,
     AnimationKeyframe,
+    Texture,
     load_texture,
 )       ### Should be deprecated
 
@@ -21,11 +30,19 @@ from config.engine import *
 from lib.foundation.base import *
 from lib.foundation.engine import *
 from lib.foundation.component import CameraHandler
+from lib.foundation.mapfile import CompiledMap, write_compiled_map
+from lib.foundation.objectindex import ObjectIndex, get_bounds
+from lib.foundation.collisioncache import get_collision_cache_key, read_collision_cache, write_collision_cache
 
 _FLIPPED_HORIZONTALLY_FLAG = 0x80000000
 _FLIPPED_VERTICALLY_FLAG = 0x40000000
 _FLIPPED_DIAGONALLY_FLAG = 0x20000000
 
+FLIP_HORIZONTALLY = _FLIPPED_HORIZONTALLY_FLAG >> 29
+FLIP_VERTICALLY = _FLIPPED_VERTICALLY_FLAG >> 29
+FLIP_DIAGONALLY = _FLIPPED_DIAGONALLY_FLAG >> 29
+''' flip bits of TiledMap.get_flip_grid() '''
+
 PointList = Sequence[Point]
 Rect = Union[Tuple[float, float, float, float], List[float]]  # x, y, width, height
 
@@ -67,6 +84,16 @@ def _get_image_source(
         )
         return None
 
+    found = _find_image_file(image_file, map_directory)
+    if found is None:
+        print(f"Warning, can't find image {image_file} for tile {tile.id}")
+    return found
+
+
+def _find_image_file(
+    image_file: Union[str, Path],
+    map_directory: Optional[str],
+) -> Optional[Path]:
     if os.path.exists(image_file):
         return image_file
 
@@ -74,11 +101,15 @@ def _get_image_source(
         try2 = Path(map_directory, image_file)
         if os.path.exists(try2):
             return try2
-
-    print(f"Warning, can't find image {image_file} for tile {tile.id}")
+    
     return None
 
 
+def _decode_image(image_file: Union[str, Path]) -> PIL.Image.Image:
+    ### same with arcade.load_texture, PIL releases GIL while decoding
+    return PIL.Image.open(image_file).convert('RGBA')
+
+
 class TiledObject(NamedTuple):
     shape: Union[Point, PointList, Rect]
     properties: Optional[Properties] = None
@@ -86,6 +117,69 @@ class TiledObject(NamedTuple):
     class_: Optional[str] = None
 
 
+class _TileLayerInfo(NamedTuple):
+    layer: pytiled_parser.TileLayer
+    gids: np.ndarray
+    ''' rows x cols uint32 gids, flip flags cleared '''
+    flips: np.ndarray
+    ''' rows x cols uint8 flip flags, FLIP_HORIZONTALLY | FLIP_VERTICALLY | FLIP_DIAGONALLY '''
+    sprite_list: ObjectLayer
+    options: Dict[str, Any]
+    world_static: bool
+
+
+def _get_raw_gids(info: _TileLayerInfo, rows: slice, cols: slice) -> List[List[int]]:
+    ''' gids with flip flags, as Tiled data '''
+    return (info.gids[rows, cols] | (info.flips[rows, cols].astype(np.uint32) << 29)).tolist()
+
+
+class _PendingTileObject(NamedTuple):
+    ''' tile object of object layer not made into sprite yet '''
+    layer: pytiled_parser.ObjectLayer
+    tiled_object: pytiled_parser.tiled_object.Tile
+    sprite_list: ObjectLayer
+    options: Dict[str, Any]
+
+
+def _get_rotated_extent(width: float, height: float, angle: float) -> Tuple[float, float]:
+    ''' half width / height of bounding box of rect rotated by angle(degrees) '''
+    radians = math.radians(angle)
+    cos, sin = abs(math.cos(radians)), abs(math.sin(radians))
+    return (width * cos + height * sin) / 2, (width * sin + height * cos) / 2
+
+
+def _get_frozen(value: Any) -> Any:
+    ''' hashable key of property value. TypeError if not hashable '''
+    if isinstance(value, dict):
+        return dict, tuple((key, _get_frozen(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return list, tuple(_get_frozen(item) for item in value)
+    hash(value)
+    return type(value), value
+
+
+def _add_tile_object(sprite_list: ObjectLayer, obj: Any) -> None:
+    if isinstance(obj, Sprite):
+        sprite_list.append(obj)
+    else:
+        sprite_list.add(obj)
+
+
+def _remove_tile_object(obj: Any, sprite: Sprite) -> None:
+    if obj is sprite:
+        sprite.remove_from_sprite_lists()
+    else:
+        obj.destroy()
+
+
+def _iter_tile_layers(layers: List[pytiled_parser.Layer]):
+    for layer in layers:
+        if isinstance(layer, pytiled_parser.TileLayer):
+            yield layer
+        elif isinstance(layer, pytiled_parser.LayerGroup):
+            yield from _iter_tile_layers(layer.layers or [])
+
+
 class TiledMap:
     """ Tiled map based world class 
     
@@ -105,6 +199,15 @@ class TiledMap:
         hit_box_detail: float = 4.5,
         offset: Vector = vectors.zero,
         space:PhysicsSpace = None,
+        streaming:bool = False,
+        chunk_size:int = 16,
+        stream_margin:int = 1,
+        workers:int = 1,
+        band_rows:int = 32,
+        collision_mode:str = 'merge',
+        preload_images:bool = True,
+        destructible:bool = False,
+        lazy_objects:bool = False,
         ) -> None:
         
         if space is None:
@@ -141,10 +244,71 @@ class TiledMap:
         ''' map offset '''
         self.tile_layers:Dict[str, ObjectLayer] = OrderedDict()
         ''' field / static / dynamic layers '''
-        self.object_layers:Dict[str, List[TiledObject]] = OrderedDict()
-        ''' Tiled objects '''
+        self.object_layers:Dict[str, ObjectIndex] = OrderedDict()
+        ''' Tiled objects by bounding box, name and class. see query_objects() '''
         self.camera: Union[Camera, CameraHandler] = None
         ''' Viewport for world draw '''
+        self.streaming:bool = streaming
+        ''' make tile layer sprites only around camera, chunk by chunk. see update_streaming() '''
+        self.chunk_size:int = chunk_size
+        ''' size of chunk in cells '''
+        self.stream_margin:int = stream_margin
+        ''' chunks to load more around view '''
+        self._origin_cell:Tuple[int, int] = (0, 0)
+        ''' Tiled cell of (0, 0) cell, for infinite map '''
+        self.destructible:bool = destructible
+        ''' build static collision per chunk at loading, for set_tile() without rebuilding whole map '''
+        self.lazy_objects:bool = lazy_objects
+        ''' make tile object sprites on first query_objects(), not at loading. always with streaming '''
+        self._chunked_collision:bool = streaming or destructible
+        ''' static collision is built and swapped chunk by chunk '''
+        self._tile_layer_infos:Dict[str, _TileLayerInfo] = OrderedDict()
+        ''' grid and options of tile layers, for chunk streaming and set_tile() '''
+        self._loaded_chunks:set[Tuple[int, int]] = set()
+        ''' materialized chunks '''
+        self._cell_objects:Dict[str, Dict[Tuple[int, int], tuple]] = {}
+        ''' (object, sprite) by (col, row) by tile layer name '''
+        self._static_shapes:list = []
+        ''' static shapes of whole map in space, if not chunked '''
+        self._chunk_shapes:Dict[Tuple[int, int], list] = {}
+        ''' static shapes in space by chunk '''
+        self._chunk_collision:Dict[Tuple[int, int], list] = {}
+        ''' static collision convexes by chunk, kept after eviction '''
+        self.workers:int = workers if workers > 0 else (os.cpu_count() or 1)
+        ''' processes for static collision building. 1 for main thread only, 0 for all cores '''
+        self.band_rows:int = band_rows
+        ''' rows of cells per static collision job of workers '''
+        self.collision_mode:str = collision_mode
+        ''' static collision convex mode, one of CONVEX_MODES. 'partition' for fewer shapes '''
+        self.preload_images:bool = preload_images
+        ''' decode tileset images concurrently before building sprites '''
+        self._executor:Optional[ProcessPoolExecutor] = None
+        self._static_collision_jobs:List[Future] = []
+        ''' convexes of row bands, in map order '''
+        self._collision_cache_key:Optional[str] = None
+        ''' static collision cache key of loaded map and options '''
+        self._compiled_map:Optional[CompiledMap] = None
+        ''' memory mapped compiled map, while its grids are in use '''
+        self._tileset_firstgids:list[int] = []
+        ''' sorted first gids of tilesets, for bisect '''
+        self._tilesets_sorted:list[pytiled_parser.Tileset] = []
+        ''' tilesets in order of _tileset_firstgids '''
+        self._tile_cache:Dict[int, Optional[pytiled_parser.Tile]] = {}
+        ''' resolved tiles by raw gid(flip flags included) '''
+        self._tile_properties:Dict[int, Tuple[pytiled_parser.Tile, Mapping]] = {}
+        ''' (tile, shared properties) by id of tile '''
+        self._property_tables:Dict[tuple, Mapping] = {}
+        ''' interned read-only property tables by contents '''
+        self._tile_classes:Dict[str, Tuple[Optional[Callable], Optional[Callable]]] = {}
+        ''' (class, batch factory) by Tiled class, resolved once per map '''
+        self._textures:Dict[tuple, arcade.Texture] = {}
+        ''' texture registry by (image, region, flips, hit box options) '''
+        self._tile_textures:Dict[tuple, Tuple[pytiled_parser.Tile, arcade.Texture]] = {}
+        ''' (tile, texture) by (id of memoized tile, hit box options) '''
+        self._image_sources:Dict[str, Optional[Path]] = {}
+        ''' resolved image paths '''
+        self._animation_keyframes:Dict[tuple, Tuple[AnimationKeyframe]] = {}
+        ''' keyframes by (tileset, tile id) '''
     
     def load_map(
         self, 
@@ -166,33 +330,43 @@ class TiledMap:
         #     offset=offset,
         # )
         
-        a = load_json(get_path(filepath))
-        a = json.dumps(a, sort_keys=True).encode('utf-8')
-        print(hashlib.md5(a).hexdigest())
-        ### cd7ababb1ccdaa97c8004b127ed2c86d
+        if not filepath and tiled_map is None: raise AttributeError('No map file path')
+        
+        ### Use compiled map if it is newer than map json. no json parsing, no hashing
+        compiled = None
+        if tiled_map is None:
+            compiled = CompiledMap.open_if_fresh(filepath)
+            if compiled is not None:
+                try:
+                    tiled_map = compiled.build_tiled_map()
+                except ValueError as e:
+                    print(f'Warning, compiled map not available : {e}')
+                    compiled.close()
+                    compiled = None
         
-        if not filepath: raise AttributeError('No map file path')
         self.map = tiled_map or pytiled_parser.parse_map(Path(get_path(filepath)))
-        if self.map.infinite: raise AttributeError('Infinite map currently not supported')
-
-        ### Try to get static collision data from cache
-        self.map_hash = get_json_md5_hexdigest(str(self.map.map_file))
-        collision_cache_filepath = ''.join(get_path(str(self.map.map_file)).split('.')[0:-1]) + '.cc'
-        try:
-            with open(collision_cache_filepath, 'rb') as f:
-                map_cc = pickle.load(f)
-        except:
-            pass   
+        self._build_tileset_index()
+        if self.preload_images: self._preload_images()
+        self._compiled_map = compiled
+
+        collision_options = self._get_collision_options(layer_options)
+        static_collision = None
+        if compiled is not None:
+            self.map_hash = compiled.map_hash
+            static_collision = compiled.get_static_collision(collision_options)
         else:
-            if map_cc:
-                if map_cc[0] == self.map_hash:
-                    self.map_static_collision = map_cc[1]
-                    self.map_static_collision_cached = True
-        ### End of static collision cache process     
+            self.map_hash = get_json_md5_hexdigest(str(self.map.map_file))
         
-        print(self.map.map_file, collision_cache_filepath)
+        ### Try to get static collision data from cache
+        self._collision_cache_key = get_collision_cache_key(self.map_hash, collision_options)
+        if static_collision is None:
+            static_collision = read_collision_cache(self.map.map_file, self._collision_cache_key)
+        if static_collision is not None:
+            self.map_static_collision = static_collision
+            self.map_static_collision_cached = True
         
         self.size = Vector(*self.map.map_size)
+        if self.map.infinite: self._assemble_infinite_layers()
         self.tile_size = Vector(*self.map.tile_size)
         self.bg_color = self.map.background_color
         self.properties = self.map.properties
@@ -215,6 +389,75 @@ class TiledMap:
                 )
             self._process_layer(layer, global_options, layer_options)
         
+        self._gather_static_collision()
+        self._add_static_collision()
+        HITBOX_CACHE.flush()
+        if self._compiled_map is not None:
+            self._compiled_map.close()      ### grids and collision are copied out
+            self._compiled_map = None
+    
+    def _get_collision_options(self, layer_options: Optional[Dict[str, Dict[str, Any]]] = None) -> dict:
+        ''' options affecting static collision, json compatible '''
+        return {
+            'scale' : self.scale,
+            'hit_box_algorithm' : self.hit_box_algorithm,
+            'hit_box_detail' : self.hit_box_detail,
+            'offset' : list(self.offset),
+            'collision_mode' : self.collision_mode,
+            'layer_options' : json.loads(json.dumps(layer_options or {}, sort_keys=True, default=repr)),
+        }
+    
+    def _submit_static_collision(self, sprite_list: ObjectLayer) -> None:
+        '''
+        Send irregular hit boxes of a world static layer to worker processes, band_rows rows per job.
+        Merging runs while next layers are built, shapes are split at band borders.
+        Full cell rectangles are merged right away, it's cheap. (partitioned with others in 'partition' mode)
+        '''
+        rects, hit_boxes = merge_full_cell_hit_boxes(sprite_list)
+        if self.collision_mode == 'partition':
+            hit_boxes = rects + hit_boxes
+        else:
+            self.map_static_collision.extend(rects)
+        if not hit_boxes: return
+        
+        band_height = self.map.tile_size[1] * self.scale * self.band_rows
+        bands:Dict[int, list] = {}
+        for hit_box in hit_boxes:
+            band = int((min(y for _, y in hit_box) - self.offset[1]) // band_height)
+            bands.setdefault(band, []).append(list(hit_box))
+        
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        for band in sorted(bands, reverse=True):    ### top to bottom, same with rows
+            self._static_collision_jobs.append(self._executor.submit(merge_convexes, [], bands[band], self.collision_mode))
+    
+    def _gather_static_collision(self) -> None:
+        ''' wait static collision jobs of workers, shut down workers '''
+        if self._executor is None: return
+        try:
+            for job in self._static_collision_jobs:
+                self.map_static_collision.extend(job.result())
+        finally:
+            self._static_collision_jobs.clear()
+            self._executor.shutdown()
+            self._executor = None
+    
+    def _add_static_collision(self) -> None:
+        ''' add static collision of all world_static layers to space, once per map '''
+        if self._chunked_collision:
+            ### added per chunk by update_streaming(), or all chunks now
+            if not self.streaming: self._update_all_chunk_collision()
+            return
+        if not self.map_static_collision: return
+        self._static_shapes = self.default_space.add_static_collison(
+                    shape_data = self.map_static_collision,
+                    collision_type= collision.wall
+                )
+        print('static collision : {} shapes, {} vertices ({})'.format(
+            *get_shape_stats(self.map_static_collision), self.collision_mode))
+        if not self.map_static_collision_cached:
+            write_collision_cache(self.map.map_file, self._collision_cache_key, self.map_static_collision)
+        
     def _process_layer(
         self,
         layer: pytiled_parser.Layer,
@@ -223,7 +466,7 @@ class TiledMap:
     ) -> None:
 
         processed: Union[
-            ObjectLayer, Tuple[Optional[ObjectLayer], Optional[List[TiledObject]]]
+            ObjectLayer, Tuple[Optional[ObjectLayer], Optional[ObjectIndex]]
         ]
 
         options = global_options
@@ -239,17 +482,19 @@ class TiledMap:
         if isinstance(layer, pytiled_parser.TileLayer):
             processed = self._process_tile_layer(layer, **options)
             self.tile_layers[layer.name] = processed
-            if processed.properties:
+            if processed.properties and not self._chunked_collision:
                 if processed.properties.get('world_static', True):
-                    if not self.map_static_collision_cached:
-                        self.map_static_collision.extend(get_merged_convexes(processed))
+                    if self.map_static_collision_cached:
+                        pass
+                    elif self.workers > 1:
+                        self._submit_static_collision(processed)
+                    else:
+                        self.map_static_collision.extend(get_merged_convexes(processed, self.collision_mode))
                     
         elif isinstance(layer, pytiled_parser.ObjectLayer):
             processed = self._process_object_layer(layer, **options)
-            if processed[0]:
-                sprite_list = processed[0]
-                if sprite_list:
-                    self.tile_layers[layer.name] = sprite_list
+            if processed[0] is not None:    ### may be empty until tile objects are made
+                self.tile_layers[layer.name] = processed[0]
             if processed[1]:
                 object_list = processed[1]
                 if object_list:
@@ -261,85 +506,271 @@ class TiledMap:
         elif isinstance(layer, pytiled_parser.LayerGroup):
             for sub_layer in layer.layers:
                 self._process_layer(sub_layer, global_options, layer_options)
-        
-        if self.map_static_collision:
-            self.default_space.add_static_collison(
-                        shape_data = self.map_static_collision,
-                        collision_type= collision.wall
-                    )
-            if not self.map_static_collision_cached:
-                collision_cache_filepath = ''.join(get_path(str(self.map.map_file)).split('.')[0:-1]) + '.cc'
-                
-                with open(collision_cache_filepath, 'wb') as f:
-                    pickle.dump((self.map_hash, self.map_static_collision), f)
 
+    def _build_tileset_index(self) -> None:
+        ''' sorted first gid index of tilesets, reset tile cache '''
+        tilesets = sorted(self.map.tilesets.items())
+        self._tileset_firstgids = [firstgid for firstgid, _ in tilesets]
+        self._tilesets_sorted = [tileset for _, tileset in tilesets]
+        self._tile_cache = {}
+        self._tile_classes = {}
+        self._tile_properties = {}
+        self._property_tables = {}
+        self._tile_textures = {}
+        self._image_sources = {}
+        self._animation_keyframes = {}
+
+    def _preload_images(self, max_workers: Optional[int] = None) -> Tuple[int, float]:
+        '''
+        Decode images of all tilesets(tiles of image collections and animation frames included)
+        in threads, and seed arcade texture cache with them, so sprites crop from decoded images.
+        Returns (decoded bytes, seconds).
+        '''
+        started = time.perf_counter()
+        map_directory = os.path.dirname(self.map.map_file)
+        image_files:Dict[str, Path] = {}
+        for tileset in self._tilesets_sorted:
+            sources = [tileset.image] if tileset.image else []
+            sources.extend(tile.image for tile in (tileset.tiles or {}).values() if tile.image)
+            for source in sources:
+                if source in self._image_sources: continue
+                image_file = _find_image_file(source, map_directory)
+                if image_file is None: continue     ### warned when a tile uses it
+                self._image_sources[source] = image_file
+                ### same key with arcade load_texture file cache
+                if str(image_file) in load_texture.texture_cache: continue
+                image_files[str(image_file)] = image_file
+        
+        if not image_files: return 0, 0.0
+        with ThreadPoolExecutor(max_workers=max_workers or min(32, len(image_files))) as executor:
+            images = list(executor.map(_decode_image, image_files.values()))
+        
+        total_bytes = 0
+        for name, image in zip(image_files, images):
+            load_texture.texture_cache[name] = Texture(name, image, 
+                                                       hit_box_algorithm=self.hit_box_algorithm, 
+                                                       hit_box_detail=self.hit_box_detail)
+            total_bytes += image.width * image.height * len(image.getbands())
+        elapsed = time.perf_counter() - started
+        print(f'preloaded {len(images)} tileset images, {total_bytes / 1048576:.1f} MiB decoded in {elapsed:.3f}s')
+        return total_bytes, elapsed
+    
     def _get_tile_by_gid(self, tile_gid: int) -> Optional[pytiled_parser.Tile]:
-        flipped_diagonally = False
-        flipped_horizontally = False
-        flipped_vertically = False
-
-        if tile_gid & _FLIPPED_HORIZONTALLY_FLAG:
-            flipped_horizontally = True
-            tile_gid -= _FLIPPED_HORIZONTALLY_FLAG
-
-        if tile_gid & _FLIPPED_DIAGONALLY_FLAG:
-            flipped_diagonally = True
-            tile_gid -= _FLIPPED_DIAGONALLY_FLAG
-
-        if tile_gid & _FLIPPED_VERTICALLY_FLAG:
-            flipped_vertically = True
-            tile_gid -= _FLIPPED_VERTICALLY_FLAG
-
-        for tileset_key, tileset in self.map.tilesets.items():
-            if tile_gid < tileset_key:
-                continue
-
+        ''' Returns tile of raw gid(flip flags included). 
+        
+        Tiles are memoized by raw gid and shared by all cells of same gid, do not modify them.
+        '''
+        try:
+            return self._tile_cache[tile_gid]
+        except KeyError:
+            tile = self._tile_cache[tile_gid] = self._resolve_tile_by_gid(tile_gid)
+            return tile
+
+    def _resolve_tile_by_gid(self, tile_gid: int) -> Optional[pytiled_parser.Tile]:
+        flipped_horizontally = bool(tile_gid & _FLIPPED_HORIZONTALLY_FLAG)
+        flipped_vertically = bool(tile_gid & _FLIPPED_VERTICALLY_FLAG)
+        flipped_diagonally = bool(tile_gid & _FLIPPED_DIAGONALLY_FLAG)
+        tile_gid &= ~(_FLIPPED_HORIZONTALLY_FLAG | _FLIPPED_VERTICALLY_FLAG | _FLIPPED_DIAGONALLY_FLAG)
+
+        ### owner tileset is the one with the largest first gid <= gid
+        index = bisect_right(self._tileset_firstgids, tile_gid) - 1
+        tile_ref = tileset = None
+        if index >= 0:
+            tileset = self._tilesets_sorted[index]
+            tile_ref = self._get_tile_ref(self._tileset_firstgids[index], tileset, tile_gid)
+        
+        if tile_ref is None:
+            ### fallback for overlapping gid ranges : first tileset having the gid, as before
+            for tileset_key, tileset in self.map.tilesets.items():
+                if tile_gid < tileset_key:
+                    continue
+                tile_ref = self._get_tile_ref(tileset_key, tileset, tile_gid)
+                if tile_ref is not None: break
+        
+        if tile_ref is None:
+            print(f"Returning NO tile for {tile_gid}.")
+            return None
+        
+        my_tile = copy.copy(tile_ref)
+        my_tile.tileset = tileset
+        my_tile.flipped_vertically = flipped_vertically
+        my_tile.flipped_diagonally = flipped_diagonally
+        my_tile.flipped_horizontally = flipped_horizontally
+        return my_tile
+
+    @staticmethod
+    def _get_tile_ref(
+        tileset_key: int, 
+        tileset: pytiled_parser.Tileset, 
+        tile_gid: int
+    ) -> Optional[pytiled_parser.Tile]:
+        ''' Returns tile of tileset for unflagged gid, None if tileset does not have it '''
+        if (
+            tileset.image is not None
+            and tileset_key <= tile_gid < tileset_key + tileset.tile_count
+        ):
             # No specific tile info, but there is a tile sheet
-            # print(f"data {tileset_key} {tileset.tiles} {tileset.image} {tileset_key} {tile_gid} {tileset.tile_count}")  # noqa
-            if (
-                tileset.image is not None
-                and tileset_key <= tile_gid < tileset_key + tileset.tile_count
-            ):
-                # No specific tile info, but there is a tile sheet
-                tile_ref = pytiled_parser.Tile(
-                    id=(tile_gid - tileset_key), image=tileset.image
-                )
-                if tileset.tiles:
-                    from_tileset = tileset.tiles.get(tile_gid)
-                    if from_tileset:
-                        tile_ref.properties = from_tileset.properties      ### Manually inject properties, by mash
-            elif tileset.tiles is None and tileset.image is not None:
-                # Not in this tileset, move to the next
-                continue
-            else:
-                if tileset.tiles is None:
-                    return None
-                tile_ref = tileset.tiles.get(tile_gid - tileset_key)
-                        
-            if tile_ref:
-                my_tile = copy.copy(tile_ref)
-                my_tile.tileset = tileset
-                my_tile.flipped_vertically = flipped_vertically
-                my_tile.flipped_diagonally = flipped_diagonally
-                my_tile.flipped_horizontally = flipped_horizontally
-                return my_tile
-
-        print(f"Returning NO tile for {tile_gid}.")
-        return None
+            tile_ref = pytiled_parser.Tile(
+                id=(tile_gid - tileset_key), image=tileset.image
+            )
+            if tileset.tiles:
+                from_tileset = tileset.tiles.get(tile_gid)
+                if from_tileset:
+                    tile_ref.properties = from_tileset.properties      ### Manually inject properties, by mash
+            return tile_ref
+        if tileset.tiles is None:
+            return None
+        return tileset.tiles.get(tile_gid - tileset_key)
 
     def _get_tile_by_id(
         self, 
         tileset: pytiled_parser.Tileset, 
         tile_id: int
     ) -> Optional[pytiled_parser.Tile]:
-        for tileset_key, cur_tileset in self.map.tilesets.items():
-            if cur_tileset is tileset:
-                for tile_key, tile in cur_tileset.tiles.items():
-                    if tile_id == tile.id:
-                        return tile
-
+        if not tileset.tiles: return None
+        tile = tileset.tiles.get(tile_id)
+        if tile is not None and tile.id == tile_id: return tile
+        ### tiles dict is keyed by id normally. scan only if not
+        for tile in tileset.tiles.values():
+            if tile_id == tile.id:
+                return tile
         return None
 
+    def _get_image_source(self, tile: pytiled_parser.Tile) -> Optional[Path]:
+        ''' resolve image path of tile once per image '''
+        key = tile.image or (tile.tileset.image if tile.tileset else None)
+        try:
+            return self._image_sources[key]
+        except KeyError:
+            image_file = self._image_sources[key] = _get_image_source(tile, os.path.dirname(self.map.map_file))
+            return image_file
+
+    def _get_texture(
+        self,
+        image_file: Union[str, Path],
+        image_x: float = 0,
+        image_y: float = 0,
+        width: float = 0,
+        height: float = 0,
+        flipped_horizontally: bool = False,
+        flipped_vertically: bool = False,
+        flipped_diagonally: bool = False,
+        hit_box_algorithm: str = "Simple",
+        hit_box_detail: float = 4.5,
+    ) -> arcade.Texture:
+        ''' Returns texture from registry of this map. 
+        
+        Textures of same image, region, flips and hit box options are loaded once 
+        and shared by all sprites of the map.
+        '''
+        key = (str(image_file), image_x, image_y, width, height, 
+               flipped_horizontally, flipped_vertically, flipped_diagonally, 
+               hit_box_algorithm, hit_box_detail)
+        try:
+            return self._textures[key]
+        except KeyError:
+            ### arcade texture cache ignores hit_box_detail, registry is the owner of the texture
+            texture = self._textures[key] = load_texture(
+                image_file, image_x, image_y, width, height,
+                flipped_horizontally=flipped_horizontally,
+                flipped_vertically=flipped_vertically,
+                flipped_diagonally=flipped_diagonally,
+                can_cache=False,
+                hit_box_algorithm=hit_box_algorithm,
+                hit_box_detail=hit_box_detail,
+            )
+            HITBOX_CACHE.apply(
+                texture, image_file, (image_x, image_y, width, height),
+                flipped_horizontally, flipped_vertically, flipped_diagonally,
+                hit_box_algorithm, hit_box_detail,
+            )
+            return texture
+
+    def _get_tile_texture(
+        self,
+        tile: pytiled_parser.Tile,
+        image_file: Union[str, Path],
+        hit_box_algorithm: str = "Simple",
+        hit_box_detail: float = 4.5,
+    ) -> arcade.Texture:
+        ''' texture of tile(memoized by _get_tile_by_gid), skipping region calculation for repeated tiles '''
+        key = (id(tile), hit_box_algorithm, hit_box_detail)
+        cached = self._tile_textures.get(key)
+        if cached is not None and cached[0] is tile: return cached[1]
+        image_x, image_y, width, height = _get_image_info_from_tileset(tile)
+        texture = self._get_texture(
+            image_file, image_x, image_y, width, height, 
+            tile.flipped_horizontally, tile.flipped_vertically, tile.flipped_diagonally,
+            hit_box_algorithm, hit_box_detail,
+        )
+        self._tile_textures[key] = (tile, texture)
+        return texture
+
+    def _get_animation_keyframes(self, tile: pytiled_parser.Tile) -> Tuple[AnimationKeyframe]:
+        ''' keyframes of animated tile, loaded once per tileset tile and shared '''
+        key = (id(tile.tileset), tile.id)
+        try:
+            return self._animation_keyframes[key]
+        except KeyError:
+            pass
+        
+        key_frame_list = []
+        for frame in tile.animation:
+            frame_tile = self._get_tile_by_id(tile.tileset, frame.tile_id)
+            if frame_tile:
+                image_file = self._get_image_source(frame_tile)
+
+                if frame_tile.image and image_file:
+                    texture = self._get_texture(image_file)
+                elif not frame_tile.image and image_file:
+                    # No image for tile, pull from tilesheet
+                    (
+                        image_x,
+                        image_y,
+                        width,
+                        height,
+                    ) = _get_image_info_from_tileset(frame_tile)
+
+                    texture = self._get_texture(
+                        image_file, image_x, image_y, width, height
+                    )
+                else:
+                    raise RuntimeError(
+                        f"Warning: failed to load image for animation frame for "
+                        f"tile '{frame_tile.id}', '{image_file}'."
+                    )
+
+                key_frame = AnimationKeyframe(  # type: ignore
+                    frame.tile_id, frame.duration, texture
+                )
+                key_frame_list.append(key_frame)
+        
+        key_frames = self._animation_keyframes[key] = tuple(key_frame_list)
+        return key_frames
+
+    def _intern_properties(self, properties: Dict[str, Any]) -> Mapping:
+        ''' read-only table of properties, same one for same contents. Not interned if values are not hashable '''
+        try:
+            key = tuple((name, _get_frozen(value)) for name, value in properties.items())
+            table = self._property_tables.get(key)
+        except TypeError:
+            return MappingProxyType(properties)
+        if table is None:
+            table = self._property_tables[key] = MappingProxyType(properties)
+        return table
+    
+    def _get_tile_properties(self, tile: pytiled_parser.Tile) -> Mapping:
+        ''' shared properties of sprites of tile. tile properties, class and tile_id '''
+        cached = self._tile_properties.get(id(tile))
+        if cached is not None and cached[0] is tile: return cached[1]
+        properties = dict(tile.properties or {})
+        if tile.class_:
+            properties["class"] = tile.class_
+        properties["tile_id"] = tile.id
+        table = self._intern_properties(properties)
+        self._tile_properties[id(tile)] = (tile, table)     ### tile kept alive, id not reused
+        return table
+    
     def _create_sprite_from_tile(
         self,
         tile: pytiled_parser.Tile,
@@ -358,9 +789,7 @@ class TiledMap:
             scale = get_from_dict(tile.properties, 'scale', scale)
         
         # --- Step 1, Find a reference to an image this is going to be based off of
-        map_source = self.map.map_file
-        map_directory = os.path.dirname(map_source)
-        image_file = _get_image_source(tile, map_directory)
+        image_file = self._get_image_source(tile)
 
         if tile.animation:
             if not custom_class:
@@ -373,8 +802,12 @@ class TiledMap:
                     Custom classes for animated tiles must subclass AnimatedTimeBasedSprite.
                     """
                 )
-            args = {"filename": image_file, "scale": scale}
-            my_sprite = custom_class(**custom_class_args, **args)  # type: ignore
+            my_sprite = custom_class(**custom_class_args, scale=scale)  # type: ignore
+            if image_file:
+                texture = self._get_texture(image_file)
+                my_sprite.texture = texture
+                my_sprite.textures = [texture]
+                my_sprite.hit_box = texture.hit_box_points
         else:
             if not custom_class:
                 custom_class = Sprite
@@ -386,32 +819,15 @@ class TiledMap:
                     Custom classes for tiles must subclass arcade.Sprite.
                     """
                 )
-            image_x, image_y, width, height = _get_image_info_from_tileset(tile)
-            args = {
-                "filename": image_file,
-                "scale": scale,
-                "image_x": image_x,
-                "image_y": image_y,
-                "image_width": width,
-                "image_height": height,
-                "flipped_horizontally": tile.flipped_horizontally,
-                "flipped_vertically": tile.flipped_vertically,
-                "flipped_diagonally": tile.flipped_diagonally,
-                "hit_box_algorithm": hit_box_algorithm,  # type: ignore
-                "hit_box_detail": hit_box_detail,
-            }
-            my_sprite = custom_class(**custom_class_args, **args)  # type: ignore
-
-        if tile.properties is not None and len(tile.properties) > 0:
-            for key, value in tile.properties.items():
-                my_sprite.properties[key] = value
-        
-        if tile.class_:
-            print(tile.properties)
-            my_sprite.properties["class"] = tile.class_
+            texture = None
+            if image_file:
+                texture = self._get_tile_texture(tile, image_file, hit_box_algorithm, hit_box_detail)
+            my_sprite = custom_class(**custom_class_args, scale=scale, texture=texture)  # type: ignore
+            if texture is not None:
+                my_sprite.textures = [texture]     ### texture= leaves textures empty unlike filename=
 
-        # Add tile ID to sprite properties
-        my_sprite.properties["tile_id"] = tile.id
+        ### tile properties, class and tile_id, shared by all sprites of the tile
+        my_sprite.properties = PropertyTable(self._get_tile_properties(tile))
 
         if tile.objects is not None:        ### set sprite.hit_box
             if not isinstance(tile.objects, pytiled_parser.ObjectLayer):
@@ -509,40 +925,9 @@ class TiledMap:
                 my_sprite.hit_box = points
 
         if tile.animation:
-            key_frame_list = []
-            for frame in tile.animation:
-                frame_tile = self._get_tile_by_id(tile.tileset, frame.tile_id)
-                if frame_tile:
-                    image_file = _get_image_source(frame_tile, map_directory)
-
-                    if frame_tile.image and image_file:
-                        texture = load_texture(image_file)
-                    elif not frame_tile.image and image_file:
-                        # No image for tile, pull from tilesheet
-                        (
-                            image_x,
-                            image_y,
-                            width,
-                            height,
-                        ) = _get_image_info_from_tileset(frame_tile)
-
-                        texture = load_texture(
-                            image_file, image_x, image_y, width, height
-                        )
-                    else:
-                        raise RuntimeError(
-                            f"Warning: failed to load image for animation frame for "
-                            f"tile '{frame_tile.id}', '{image_file}'."
-                        )
-
-                    key_frame = AnimationKeyframe(  # type: ignore
-                        frame.tile_id, frame.duration, texture
-                    )
-                    key_frame_list.append(key_frame)
-
-                    if len(key_frame_list) == 1:
-                        my_sprite.texture = key_frame.texture
-
+            key_frame_list = list(self._get_animation_keyframes(tile))
+            if key_frame_list:
+                my_sprite.texture = key_frame_list[0].texture
             cast(AnimatedTimeBasedSprite, my_sprite).frames = key_frame_list
 
         return my_sprite
@@ -572,75 +957,151 @@ class TiledMap:
         sprite_list: ObjectLayer = ObjectLayer(
             self.default_space if set_physics else None,
             use_spatial_hash=use_spatial_hash)
+        sprite_list.visible = layer.visible
+        if layer.properties:
+            sprite_list.properties = layer.properties
         
         map_array = layer.data
-        # Loop through the layer and add in the list
+        if isinstance(map_array, np.ndarray):   ### memory mapped grid of compiled map
+            map_array = map_array.tolist()
+        options = {
+            "scale": scale,
+            "hit_box_algorithm": hit_box_algorithm,
+            "hit_box_detail": hit_box_detail,
+            "offset": offset,
+            "custom_class": custom_class,
+            "custom_class_args": custom_class_args,
+        }
+        
+        world_static = bool(layer.properties) and layer.properties.get('world_static', True)
+        raw_gids = np.array(layer.data, dtype=np.uint32, ndmin=2)
+        if isinstance(layer.data, np.ndarray): layer.data = raw_gids     ### release memory map of compiled map
+        self._tile_layer_infos[layer.name] = _TileLayerInfo(
+            layer, raw_gids & np.uint32(0x1FFFFFFF), (raw_gids >> 29).astype(np.uint8), 
+            sprite_list, options, world_static)
+        cells = self._cell_objects[layer.name] = {}
+        if self.streaming:
+            ### sprites are made per chunk by update_streaming()
+            return sprite_list
         
+        # Loop through the layer and add in the list
         tqdmed = tqdm(total = len(map_array) * len(map_array[0]), desc = f'Loading {layer.name}')
-        for row, rows in enumerate(map_array):
-            for col, item in enumerate(rows):
-                # Check for an empty tile
-                if item == 0:
-                    continue
-                tile = self._get_tile_by_gid(item)
-                if tile is None:
-                    raise ValueError(
-                        (
-                            f"Couldn't find tile for item {item} in layer "
-                            f"'{layer.name}' in file '{self.map.map_file}'"
-                            f"at ({col}, {row})."
-                        )
-                    )
-                
-                my_sprite:Sprite
-                my_sprite = self._create_sprite_from_tile(
-                    tile,
-                    scale=scale,
-                    hit_box_algorithm=hit_box_algorithm,
-                    hit_box_detail=hit_box_detail,
-                    custom_class=custom_class,
-                    custom_class_args=custom_class_args,
-                )
-                
-                if my_sprite is None:
-                    print(
-                        f"Warning: Could not create sprite number {item} in layer '{layer.name}' {tile.image}"
-                    )
-                else:
-                    my_sprite.center_x = (
-                        col * (self.map.tile_size[0] * scale)
-                        + my_sprite.width / 2
-                    ) + offset[0]
-                    my_sprite.center_y = (
-                        (self.map.map_size.height - row - 1)
-                        * (self.map.tile_size[1] * scale)
-                        + my_sprite.height / 2
-                    ) + offset[1]
-
-                    # Tint
-                    if layer.tint_color:
-                        my_sprite.color = layer.tint_color
-
-                    # Opacity
-                    opacity = layer.opacity
-                    if opacity:
-                        my_sprite.alpha = int(opacity * 255)
-                    
-                    class_ = get_class_loaded(tile.class_)
-                    if class_ is None:
-                        sprite_list.append(my_sprite)
-                    else:
-                        sprite_list.add(
-                            class_(sprite = my_sprite)
-                        )
-                tqdmed.update(1)
-
-        sprite_list.visible = layer.visible
-        if layer.properties:
-            sprite_list.properties = layer.properties
+        items = [
+            (col, row, item)
+            for row, rows in enumerate(map_array)
+            for col, item in enumerate(rows)
+            if item != 0    # Check for an empty tile
+        ]
+        for cell, obj, sprite in self._create_tile_objects(layer, sprite_list, items, tqdmed, **options):
+            cells[cell] = (obj, sprite)
         
         return sprite_list
     
+    def _get_tile_class(self, class_name: Optional[str]) -> Tuple[Optional[Callable], Optional[Callable]]:
+        ''' (class, batch factory) of Tiled class, see register_class() '''
+        if not class_name: return None, None
+        resolved = self._tile_classes.get(class_name)
+        if resolved is None:
+            resolved = self._tile_classes[class_name] = (resolve_class(class_name), BATCH_FACTORIES.get(class_name))
+        return resolved
+    
+    def _make_tile_objects(self, sprites: Sequence[Tuple[Optional[str], Sprite]]) -> List[Any]:
+        ''' objects of (Tiled class, sprite) in order. Sprite itself without class, one factory call per batch class '''
+        objs = []
+        batches:Dict[Callable, List[int]] = {}
+        for index, (class_name, sprite) in enumerate(sprites):
+            class_, factory = self._get_tile_class(class_name)
+            if factory is not None:
+                batches.setdefault(factory, []).append(index)
+                objs.append(None)
+            else:
+                objs.append(sprite if class_ is None else class_(sprite = sprite))
+        for factory, indices in batches.items():
+            for index, obj in zip(indices, factory([sprites[index][1] for index in indices])):
+                objs[index] = obj
+        return objs
+    
+    def _create_tile_objects(
+        self,
+        layer: pytiled_parser.TileLayer,
+        sprite_list: ObjectLayer,
+        items: Sequence[Tuple[int, int, int]],
+        progress: Optional[tqdm] = None,
+        **options,
+    ) -> List[Tuple[Tuple[int, int], Any, Sprite]]:
+        ''' Make sprites(or objects of tile class) of cells(col, row, gid), add to sprite_list in order. Returns ((col, row), object, sprite) '''
+        made = []
+        for col, row, item in items:
+            class_name, sprite = self._create_tile_sprite(layer, col, row, item, **options)
+            if sprite is not None: made.append(((col, row), class_name, sprite))
+            if progress is not None: progress.update(1)
+        
+        objs = self._make_tile_objects([(class_name, sprite) for _, class_name, sprite in made])
+        for obj in objs:
+            _add_tile_object(sprite_list, obj)
+        return [(cell, obj, sprite) for (cell, _, sprite), obj in zip(made, objs)]
+    
+    def _create_tile_sprite(
+        self,
+        layer: pytiled_parser.TileLayer,
+        col: int,
+        row: int,
+        item: int,
+        scale: float = 1.0,
+        hit_box_algorithm: str = "Detailed",
+        hit_box_detail: float = 4.5,
+        offset: Vector = vectors.zero,
+        custom_class: Optional[type] = None,
+        custom_class_args: Dict[str, Any] = {},
+    ) -> Tuple[Optional[str], Optional[Sprite]]:
+        ''' Make sprite of a cell. Returns (Tiled class of tile, sprite) '''
+        tile = self._get_tile_by_gid(item)
+        if tile is None:
+            raise ValueError(
+                (
+                    f"Couldn't find tile for item {item} in layer "
+                    f"'{layer.name}' in file '{self.map.map_file}'"
+                    f"at ({col}, {row})."
+                )
+            )
+        
+        my_sprite:Sprite
+        my_sprite = self._create_sprite_from_tile(
+            tile,
+            scale=scale,
+            hit_box_algorithm=hit_box_algorithm,
+            hit_box_detail=hit_box_detail,
+            custom_class=custom_class,
+            custom_class_args=custom_class_args,
+        )
+        
+        if my_sprite is None:
+            print(
+                f"Warning: Could not create sprite number {item} in layer '{layer.name}' {tile.image}"
+            )
+            return None, None
+        
+        my_sprite.center_x = (
+            col * (self.map.tile_size[0] * scale)
+            + my_sprite.width / 2
+        ) + offset[0]
+        my_sprite.center_y = (
+            (self.size.y - row - 1)
+            * (self.map.tile_size[1] * scale)
+            + my_sprite.height / 2
+        ) + offset[1]
+
+        # Tint
+        if layer.tint_color:
+            my_sprite.color = layer.tint_color
+
+        # Opacity
+        opacity = layer.opacity
+        if opacity:
+            my_sprite.alpha = int(opacity * 255)
+        
+        return tile.class_, my_sprite
+    
     def _process_object_layer(
         self,
         layer: pytiled_parser.ObjectLayer,
@@ -651,7 +1112,7 @@ class TiledMap:
         offset: Vector = vectors.zero,
         custom_class: Optional[type] = None,
         custom_class_args: Dict[str, Any] = {},
-    ) -> Tuple[Optional[ObjectLayer], Optional[List[TiledObject]]]:
+    ) -> Tuple[Optional[ObjectLayer], Optional[ObjectIndex]]:
 
         if not scale:
             scale = self.scale
@@ -662,108 +1123,46 @@ class TiledMap:
             set_physics = True
         
         sprite_list: Optional[ObjectLayer] = None
-        objects_list: Optional[List[TiledObject]] = []
+        objects = ObjectIndex(self.chunk_size * self.map.tile_size[0] * scale)
+        tile_object_options = {
+            "scale": scale,
+            "hit_box_algorithm": hit_box_algorithm,
+            "hit_box_detail": hit_box_detail,
+            "offset": offset,
+            "custom_class": custom_class,
+            "custom_class_args": custom_class_args,
+        }
+        lazy = self.lazy_objects or self.streaming
+        pendings:List[_PendingTileObject] = []
+        origin_x = self._origin_cell[0] * self.map.tile_size[0]    ### infinite map
+        origin_y = self._origin_cell[1] * self.map.tile_size[1]
 
         for cur_object in layer.tiled_objects:
             # shape: Optional[Union[Point, PointList, Rect]] = None
             if isinstance(cur_object, pytiled_parser.tiled_object.Tile):
-                if not sprite_list:
+                if sprite_list is None:
                     sprite_list = ObjectLayer(
                         self.default_space if set_physics else None,
                         use_spatial_hash=use_spatial_hash)
                     sprite_list.visible = layer.visible
 
                 tile = self._get_tile_by_gid(cur_object.gid)
-                my_sprite = self._create_sprite_from_tile(
-                    tile,
-                    scale=scale,
-                    hit_box_algorithm=hit_box_algorithm,
-                    hit_box_detail=hit_box_detail,
-                    custom_class=custom_class,
-                    custom_class_args=custom_class_args,
-                )
-
-                x = (cur_object.coordinates.x * scale) + offset[0]
-                y = (
-                    (
-                        self.map.map_size.height * self.map.tile_size[1]
-                        - cur_object.coordinates.y
-                    )
-                    * scale
-                ) + offset[1]
-
-                my_sprite.width = width = cur_object.size[0] * scale
-                my_sprite.height = height = cur_object.size[1] * scale
-                center_x = width / 2
-                center_y = height / 2
-                x += center_x
-                y += center_y
-                if cur_object.rotation:
-                    rotation = -math.radians(cur_object.rotation)
-                else:
-                    rotation = 0
-
-                angle_degrees = math.degrees(rotation)
-                rotated_center_x, rotated_center_y = rotate_point(
-                    (0,0), angle_degrees, (width / 2, height / 2)
+                pending = _PendingTileObject(layer, cur_object, sprite_list, tile_object_options)
+                position, width, height, angle = self._get_tile_object_geometry(cur_object, scale, offset)
+                extent_x, extent_y = _get_rotated_extent(width, height, angle)
+                objects.add(
+                    pending, 
+                    (position[0] - extent_x, position[1] - extent_y, position[0] + extent_x, position[1] + extent_y),
+                    cur_object.name, 
+                    cur_object.class_ or (tile.class_ if tile else None),
                 )
-
-                my_sprite.position = (x + rotated_center_x, y + rotated_center_y)
-                my_sprite.angle = angle_degrees
-
-                if layer.tint_color:
-                    my_sprite.color = layer.tint_color
-
-                opacity = layer.opacity
-                if opacity:
-                    my_sprite.alpha = int(opacity * 255)
-
-                if cur_object.properties and "change_x" in cur_object.properties:
-                    my_sprite.change_x = float(cur_object.properties["change_x"])
-
-                if cur_object.properties and "change_y" in cur_object.properties:
-                    my_sprite.change_y = float(cur_object.properties["change_y"])
-
-                if cur_object.properties and "boundary_bottom" in cur_object.properties:
-                    my_sprite.boundary_bottom = float(
-                        cur_object.properties["boundary_bottom"]
-                    )
-
-                if cur_object.properties and "boundary_top" in cur_object.properties:
-                    my_sprite.boundary_top = float(
-                        cur_object.properties["boundary_top"]
-                    )
-
-                if cur_object.properties and "boundary_left" in cur_object.properties:
-                    my_sprite.boundary_left = float(
-                        cur_object.properties["boundary_left"]
-                    )
-
-                if cur_object.properties and "boundary_right" in cur_object.properties:
-                    my_sprite.boundary_right = float(
-                        cur_object.properties["boundary_right"]
-                    )
-
-                if cur_object.properties:
-                    my_sprite.properties.update(cur_object.properties)
-                
-                class_ = get_class_loaded(tile.class_)
-                if class_ is None:
-                    sprite_list.append(my_sprite)
-                else:
-                    sprite_list.add(
-                        class_(sprite = my_sprite)
-                    )
-                
-                if cur_object.name:     ### What is this for?
-                    my_sprite.properties["name"] = cur_object.name
-
+                if not lazy: pendings.append(pending)
                 continue
             
             elif isinstance(cur_object, pytiled_parser.tiled_object.Point):
-                x = cur_object.coordinates.x * scale
+                x = (cur_object.coordinates.x - origin_x) * scale
                 y = (
-                    self.map.map_size.height * self.map.tile_size[1]
+                    (self.size.y + self._origin_cell[1]) * self.map.tile_size[1]
                     - cur_object.coordinates.y
                 ) * scale
 
@@ -774,16 +1173,16 @@ class TiledMap:
                         f"WARNING: Tiled object with ID {cur_object.id} is a rectangle "
                         "with a width and height of 0. Loading it as a single point."
                     )
-                    x = cur_object.coordinates.x * scale
+                    x = (cur_object.coordinates.x - origin_x) * scale
                     y = (
-                        self.map.map_size.height * self.map.tile_size[1]
+                        (self.size.y + self._origin_cell[1]) * self.map.tile_size[1]
                         - cur_object.coordinates.y
                     ) * scale
 
                     shape = [x + offset[0], y + offset[1]]
                 else:
-                    x = cur_object.coordinates.x + offset[0]
-                    y = cur_object.coordinates.y + offset[1]
+                    x = cur_object.coordinates.x - origin_x + offset[0]
+                    y = cur_object.coordinates.y - origin_y + offset[1]
                     sx = x
                     sy = -y
                     ex = x + cur_object.size.width
@@ -800,8 +1199,8 @@ class TiledMap:
             ) or isinstance(cur_object, pytiled_parser.tiled_object.Polyline):
                 shape = []
                 for point in cur_object.points:
-                    x = point.x + cur_object.coordinates.x
-                    y = (self.size.y * self.tile_size.y) - (
+                    x = point.x + cur_object.coordinates.x - origin_x
+                    y = ((self.size.y + self._origin_cell[1]) * self.tile_size.y) - (
                         point.y + cur_object.coordinates.y
                     )
                     point = (x + offset[0], y + offset[1])
@@ -813,8 +1212,8 @@ class TiledMap:
             elif isinstance(cur_object, pytiled_parser.tiled_object.Ellipse):
                 hw = cur_object.size.width / 2
                 hh = cur_object.size.height / 2
-                cx = cur_object.coordinates.x + hw
-                cy = cur_object.coordinates.y + hh
+                cx = cur_object.coordinates.x - origin_x + hw
+                cy = cur_object.coordinates.y - origin_y + hh
 
                 total_steps = 8
                 angles = [
@@ -833,14 +1232,451 @@ class TiledMap:
                 tiled_object = TiledObject(
                     shape, cur_object.properties, cur_object.name, cur_object.class_
                 )
+                objects.add(tiled_object, get_bounds(shape), cur_object.name, cur_object.class_)
 
-                if not objects_list:
-                    objects_list = []
-
-                objects_list.append(tiled_object)
+        self._materialize_tile_objects(objects, pendings)
+        return sprite_list, objects or None
+    
+    def _get_tile_object_geometry(
+        self,
+        cur_object: pytiled_parser.tiled_object.Tile,
+        scale: float,
+        offset: Vector,
+    ) -> Tuple[Tuple[float, float], float, float, float]:
+        ''' (position, width, height, angle) of sprite of tile object '''
+        origin_x = self._origin_cell[0] * self.map.tile_size[0]    ### infinite map
+        x = ((cur_object.coordinates.x - origin_x) * scale) + offset[0]
+        y = (
+            (
+                (self.size.y + self._origin_cell[1]) * self.map.tile_size[1]
+                - cur_object.coordinates.y
+            )
+            * scale
+        ) + offset[1]
+
+        width = cur_object.size[0] * scale
+        height = cur_object.size[1] * scale
+        center_x = width / 2
+        center_y = height / 2
+        x += center_x
+        y += center_y
+        if cur_object.rotation:
+            rotation = -math.radians(cur_object.rotation)
+        else:
+            rotation = 0
 
-        return sprite_list or None, objects_list or None
+        angle_degrees = math.degrees(rotation)
+        rotated_center_x, rotated_center_y = rotate_point(
+            (0,0), angle_degrees, (width / 2, height / 2)
+        )
+        return (x + rotated_center_x, y + rotated_center_y), width, height, angle_degrees
+    
+    def _create_tile_object_sprite(self, pending: _PendingTileObject) -> Tuple[Optional[str], Sprite]:
+        ''' Make sprite of tile object. Returns (Tiled class of tile, sprite) '''
+        layer, cur_object, sprite_list, options = pending
+        tile = self._get_tile_by_gid(cur_object.gid)
+        my_sprite = self._create_sprite_from_tile(
+            tile,
+            scale=options['scale'],
+            hit_box_algorithm=options['hit_box_algorithm'],
+            hit_box_detail=options['hit_box_detail'],
+            custom_class=options['custom_class'],
+            custom_class_args=options['custom_class_args'],
+        )
 
+        position, width, height, angle = self._get_tile_object_geometry(
+            cur_object, options['scale'], options['offset'])
+        my_sprite.width = width
+        my_sprite.height = height
+        my_sprite.position = position
+        my_sprite.angle = angle
+
+        if layer.tint_color:
+            my_sprite.color = layer.tint_color
+
+        opacity = layer.opacity
+        if opacity:
+            my_sprite.alpha = int(opacity * 255)
+
+        if cur_object.properties and "change_x" in cur_object.properties:
+            my_sprite.change_x = float(cur_object.properties["change_x"])
+
+        if cur_object.properties and "change_y" in cur_object.properties:
+            my_sprite.change_y = float(cur_object.properties["change_y"])
+
+        if cur_object.properties and "boundary_bottom" in cur_object.properties:
+            my_sprite.boundary_bottom = float(
+                cur_object.properties["boundary_bottom"]
+            )
+
+        if cur_object.properties and "boundary_top" in cur_object.properties:
+            my_sprite.boundary_top = float(
+                cur_object.properties["boundary_top"]
+            )
+
+        if cur_object.properties and "boundary_left" in cur_object.properties:
+            my_sprite.boundary_left = float(
+                cur_object.properties["boundary_left"]
+            )
+
+        if cur_object.properties and "boundary_right" in cur_object.properties:
+            my_sprite.boundary_right = float(
+                cur_object.properties["boundary_right"]
+            )
+
+        if cur_object.properties or cur_object.name:
+            ### shared by objects of same tile and properties(i.e. instances of a template)
+            properties = dict(my_sprite.properties)
+            if cur_object.properties:
+                properties.update(cur_object.properties)
+            if cur_object.name:     ### What is this for?
+                properties["name"] = cur_object.name
+            my_sprite.properties = PropertyTable(self._intern_properties(properties))
+        
+        return tile.class_, my_sprite
+    
+    def _materialize_tile_objects(self, objects: ObjectIndex, pendings: Sequence[_PendingTileObject]) -> List[Any]:
+        ''' Make sprites(or objects of tile class) of tile objects, add to sprite lists and swap in index '''
+        objs = self._make_tile_objects([self._create_tile_object_sprite(pending) for pending in pendings])
+        for pending, obj in zip(pendings, objs):
+            _add_tile_object(pending.sprite_list, obj)
+            objects.replace(pending, obj)
+        return objs
+    
+    def _materialize_objects(self, objects: Sequence[Any], layer: str) -> List[Any]:
+        ''' objects of layer with pending tile objects made into sprites '''
+        pendings = [obj for obj in objects if isinstance(obj, _PendingTileObject)]
+        if not pendings: return list(objects)
+        made = dict(zip(map(id, pendings), self._materialize_tile_objects(self.object_layers[layer], pendings)))
+        return [made.get(id(obj), obj) for obj in objects]
+    
+    def query_objects(
+        self,
+        rect: Optional[Tuple[float, float, float, float]] = None,
+        class_: Optional[str] = None,
+        name: Optional[str] = None,
+        layer: Optional[str] = None,
+    ) -> List[Any]:
+        '''
+        Objects of object layers matching all given conditions, in map order.
+        TiledObject for shapes, sprite(or object of tile class) for tile objects, made on first request.
+        
+        rect : (left, bottom, right, top), objects whose bounding box overlaps it
+        class_, name : class / name of Tiled object. class of tile if tile object has no class
+        layer : name of object layer, all object layers if None
+        '''
+        layers = self.object_layers if layer is None else {layer : self.object_layers[layer]}
+        found = []
+        for layer_name, index in layers.items():
+            found.extend(self._materialize_objects(index.query(rect, name, class_), layer_name))
+        return found
+
+    def _assemble_infinite_layers(self) -> None:
+        ''' Assemble chunks of infinite map tile layers into dense grids. 
+        Top-left cell of all chunks becomes (0, 0) cell of the map. '''
+        layers = [layer for layer in _iter_tile_layers(self.map.layers)]
+        chunks = [chunk for layer in layers for chunk in (layer.chunks or [])]
+        if not chunks:
+            self.size = Vector(0, 0)
+            return
+        min_x = int(min(chunk.coordinates.x for chunk in chunks))
+        min_y = int(min(chunk.coordinates.y for chunk in chunks))
+        width = int(max(chunk.coordinates.x + chunk.size.width for chunk in chunks)) - min_x
+        height = int(max(chunk.coordinates.y + chunk.size.height for chunk in chunks)) - min_y
+        
+        for layer in layers:
+            grid = np.zeros((height, width), dtype=np.uint32)
+            for chunk in layer.chunks or []:
+                x = int(chunk.coordinates.x) - min_x
+                y = int(chunk.coordinates.y) - min_y
+                grid[y:y + chunk.size.height, x:x + chunk.size.width] = chunk.data
+            layer.data = grid
+        
+        self._origin_cell = (min_x, min_y)
+        self.size = Vector(width, height)
+    
+    def _get_view_rect(self) -> Optional[Tuple[float, float, float, float]]:
+        ''' (left, bottom, right, top) of camera view in world coordinates '''
+        camera = self.camera
+        if isinstance(camera, CameraHandler): camera = camera.camera
+        if camera is None: return None
+        left, bottom = camera.position
+        scale = getattr(camera, 'scale', 1.0) or 1.0
+        return left, bottom, left + camera.viewport_width * scale, bottom + camera.viewport_height * scale
+    
+    def _get_chunks_in_rect(
+        self, 
+        rect: Tuple[float, float, float, float], 
+        margin: int = 0,
+    ) -> set[Tuple[int, int]]:
+        ''' (chunk col, chunk row) of chunks overlapping rect in any tile layer, plus margin chunks '''
+        if not self.size or not self.size.x or not self.size.y: return set()
+        left, bottom, right, top = rect
+        size = self.chunk_size
+        last_col, last_row = (self.size.x - 1) // size, (self.size.y - 1) // size
+        chunks = set()
+        for layer in self._get_geometry_layers():
+            col_min, row_min = self.world_to_cell((left, top), layer)
+            col_max, row_max = self.world_to_cell((right, bottom), layer)
+            cx_min, cx_max = max(col_min // size - margin, 0), min(col_max // size + margin, last_col)
+            cy_min, cy_max = max(row_min // size - margin, 0), min(row_max // size + margin, last_row)
+            chunks.update((cx, cy) for cx in range(cx_min, cx_max + 1) for cy in range(cy_min, cy_max + 1))
+        return chunks
+    
+    def _get_geometry_layers(self) -> List[Optional[str]]:
+        ''' a tile layer per distinct (scale, offset) of tile layers, [None](map geometry) if no tile layer '''
+        layers = {}
+        for name in self._tile_layer_infos:
+            cell_width, cell_height, offset = self._get_cell_geometry(name)
+            layers.setdefault((cell_width, cell_height, tuple(offset)), name)
+        return list(layers.values()) or [None]
+    
+    def update_streaming(self, view_rect: Optional[Tuple[float, float, float, float]] = None) -> bool:
+        '''
+        Materialize chunks around view(stream_margin chunks more), evict chunks far from it.
+        
+        view_rect : (left, bottom, right, top) in world coordinates. camera view if None.
+        Chunks are evicted one more chunk farther than loading, not to thrash on chunk borders.
+        '''
+        if not self.streaming or not self._tile_layer_infos: return False
+        if view_rect is None: view_rect = self._get_view_rect()
+        if view_rect is None: return False
+        
+        keep = self._get_chunks_in_rect(view_rect, self.stream_margin + 1)
+        for chunk in self._loaded_chunks - keep:
+            self._evict_chunk(chunk)
+        for chunk in self._get_chunks_in_rect(view_rect, self.stream_margin) - self._loaded_chunks:
+            self._load_chunk(chunk)
+        return True
+    
+    def _get_chunk_cells(self, chunk: Tuple[int, int]):
+        ''' (col, row) of cells in chunk '''
+        cx, cy = chunk
+        size = self.chunk_size
+        for row in range(cy * size, min((cy + 1) * size, self.size.y)):
+            for col in range(cx * size, min((cx + 1) * size, self.size.x)):
+                yield col, row
+    
+    def _get_chunk_rect(self, chunk: Tuple[int, int], layer: Optional[str] = None) -> Tuple[float, float, float, float]:
+        '''
+        (left, bottom, right, top) of chunk in world with scale / offset of tile layer,
+        bounding rect of the chunk in all tile layers if None. Chunks on map border extend to infinity
+        '''
+        cx, cy = chunk
+        size = self.chunk_size
+        col_end, row_end = min((cx + 1) * size, self.size.x), min((cy + 1) * size, self.size.y)
+        rects = []
+        for name in ([layer] if layer is not None else self._get_geometry_layers()):
+            cell_width, cell_height, offset = self._get_cell_geometry(name)
+            rects.append((
+                cx * cell_width * size + offset[0] if cx > 0 else -math.inf,
+                (self.size.y - row_end) * cell_height + offset[1] if row_end < self.size.y else -math.inf,
+                col_end * cell_width + offset[0] if col_end < self.size.x else math.inf,
+                (self.size.y - cy * size) * cell_height + offset[1] if cy > 0 else math.inf,
+            ))
+        lefts, bottoms, rights, tops = zip(*rects)
+        return min(lefts), min(bottoms), max(rights), max(tops)
+    
+    def _load_chunk(self, chunk: Tuple[int, int]) -> None:
+        cx, cy = chunk
+        size = self.chunk_size
+        for name, info in self._tile_layer_infos.items():
+            cells = self._cell_objects[name]
+            raw_gids = _get_raw_gids(info, slice(cy * size, (cy + 1) * size), slice(cx * size, (cx + 1) * size))
+            items = [
+                (col, row, raw_gids[row - cy * size][col - cx * size])
+                for col, row in self._get_chunk_cells(chunk)
+                if raw_gids[row - cy * size][col - cx * size]
+            ]
+            for cell, obj, sprite in self._create_tile_objects(info.layer, info.sprite_list, items, **info.options):
+                cells[cell] = (obj, sprite)
+        self._update_chunk_collision(chunk)
+        for layer in self.object_layers:    ### tile objects stay once made, they may be actors
+            self._materialize_objects(self.object_layers[layer].query(self._get_chunk_rect(chunk)), layer)
+        self._loaded_chunks.add(chunk)
+    
+    def _evict_chunk(self, chunk: Tuple[int, int]) -> None:
+        for name in self._tile_layer_infos:
+            cells = self._cell_objects[name]
+            for cell in self._get_chunk_cells(chunk):
+                if cell in cells: _remove_tile_object(*cells.pop(cell))
+        shapes = self._chunk_shapes.pop(chunk, None)
+        if shapes: self.default_space.remove(*shapes)
+        self._loaded_chunks.discard(chunk)
+    
+    def _update_chunk_collision(self, chunk: Tuple[int, int]) -> None:
+        ''' (re)build static collision of chunk from world_static tiles in it, swap shapes in space '''
+        shapes = self._chunk_shapes.pop(chunk, None)
+        if shapes: self.default_space.remove(*shapes)
+        
+        if chunk not in self._chunk_collision:
+            static_sprites = [
+                cells[cell][1]
+                for name, cells in self._cell_objects.items() if self._tile_layer_infos[name].world_static
+                for cell in self._get_chunk_cells(chunk) if cell in cells
+            ]
+            rects, hit_boxes = merge_full_cell_hit_boxes(static_sprites)
+            self._chunk_collision[chunk] = merge_convexes(rects, hit_boxes, self.collision_mode) if static_sprites else []
+        
+        if not self._chunk_collision[chunk]: return
+        shapes = setup_shapes(
+            self.default_space.static_body,
+            collision_type = collision.wall,
+            shape_data = self._chunk_collision[chunk],
+            friction = 1.0,
+        )
+        self.default_space.add(*shapes)
+        self._chunk_shapes[chunk] = shapes
+    
+    def _update_all_chunk_collision(self) -> None:
+        ''' static collision of whole map, chunk by chunk. whole map shapes are removed '''
+        if self._static_shapes:
+            self.default_space.remove(*self._static_shapes)
+            self._static_shapes = []
+        self._chunked_collision = True
+        size = self.chunk_size
+        for cy in range((self.size.y + size - 1) // size):
+            for cx in range((self.size.x + size - 1) // size):
+                self._update_chunk_collision((cx, cy))
+        print('static collision : {} shapes by chunks ({})'.format(
+            sum(len(shapes) for shapes in self._chunk_shapes.values()), self.collision_mode))
+    
+    def _get_layer_info(self, layer: str) -> _TileLayerInfo:
+        info = self._tile_layer_infos.get(layer)
+        if info is None: raise KeyError(f'No tile layer {layer} in map')
+        return info
+    
+    def _get_cell_geometry(self, layer: Optional[str] = None) -> Tuple[float, float, Vector]:
+        ''' (cell width, cell height, offset) in world, with options of layer if given '''
+        scale, offset = self.scale, self.offset
+        if layer is not None:
+            options = self._get_layer_info(layer).options
+            scale, offset = options['scale'], options['offset']
+        return self.map.tile_size[0] * scale, self.map.tile_size[1] * scale, offset
+    
+    def world_to_cell(self, position: Tuple[float, float], layer: Optional[str] = None) -> Tuple[int, int]:
+        ''' (col, row) of cell containing world position. row 0 is the top row as Tiled. May be out of map. '''
+        cell_width, cell_height, offset = self._get_cell_geometry(layer)
+        col = math.floor((position[0] - offset[0]) / cell_width)
+        row = self.size.y - 1 - math.floor((position[1] - offset[1]) / cell_height)
+        return col, row
+    
+    def cell_to_world(self, col: int, row: int, layer: Optional[str] = None) -> Vector:
+        ''' world position of center of cell '''
+        cell_width, cell_height, offset = self._get_cell_geometry(layer)
+        return Vector((col + 0.5) * cell_width + offset[0], 
+                      (self.size.y - row - 0.5) * cell_height + offset[1])
+    
+    def get_gid_grid(self, layer: str) -> np.ndarray:
+        ''' rows x cols uint32 gids of tile layer, flip flags cleared. 0 is empty. Use set_tile() to change. '''
+        return self._get_layer_info(layer).gids
+    
+    def get_flip_grid(self, layer: str) -> np.ndarray:
+        ''' rows x cols uint8 flip flags of tile layer, FLIP_HORIZONTALLY | FLIP_VERTICALLY | FLIP_DIAGONALLY '''
+        return self._get_layer_info(layer).flips
+    
+    def tile_at(self, position: Tuple[float, float], layer: str) -> Optional[pytiled_parser.Tile]:
+        ''' Tile at world position in layer, None if empty or out of map '''
+        info = self._get_layer_info(layer)
+        col, row = self.world_to_cell(position, layer)
+        rows, cols = info.gids.shape
+        if not (0 <= row < rows and 0 <= col < cols): return None
+        gid = int(info.gids[row, col])
+        if not gid: return None
+        return self._get_tile_by_gid(gid | int(info.flips[row, col]) << 29)
+    
+    def cells_in_rect(
+        self, 
+        rect: Tuple[float, float, float, float], 
+        layer: Optional[str] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        '''
+        N x 2 array of (col, row) of cells overlapping world rect(left, bottom, right, top), clipped to map.
+        With layer, only non-empty cells of the layer. With mask(rows x cols bool, i.e. mask_where()), only True cells.
+        '''
+        left, bottom, right, top = rect
+        col_min, row_min = self.world_to_cell((left, top), layer)
+        col_max, row_max = self.world_to_cell((right, bottom), layer)
+        col_min, row_min = max(col_min, 0), max(row_min, 0)
+        col_max, row_max = min(col_max, self.size.x - 1), min(row_max, self.size.y - 1)
+        if col_min > col_max or row_min > row_max: return np.empty((0, 2), dtype=np.intp)
+        
+        selected = np.ones((row_max - row_min + 1, col_max - col_min + 1), dtype=bool)
+        if layer is not None:
+            selected &= self._get_layer_info(layer).gids[row_min:row_max + 1, col_min:col_max + 1] != 0
+        if mask is not None:
+            selected &= mask[row_min:row_max + 1, col_min:col_max + 1]
+        rows, cols = np.nonzero(selected)
+        return np.column_stack((cols + col_min, rows + row_min))
+    
+    def mask_where(
+        self, 
+        layer: str, 
+        property: Optional[str] = None, 
+        value: Any = None, 
+        class_: Optional[str] = None,
+        gids: Optional[Sequence[int]] = None,
+    ) -> np.ndarray:
+        '''
+        rows x cols bool mask of cells of layer matching all given conditions.
+        Tiles are checked once per distinct gid, cells are mapped by numpy.
+        
+        property : tile has the property, truthy if value is None, equal to value if given
+        class_ : class of tile
+        gids : one of gids(flip flags cleared)
+        '''
+        grid = self._get_layer_info(layer).gids
+        distinct, inverse = np.unique(grid, return_inverse=True)
+        matched = np.zeros(len(distinct), dtype=bool)
+        gid_set = set(gids) if gids is not None else None
+        for index, gid in enumerate(distinct.tolist()):
+            if not gid: continue
+            if gid_set is not None and gid not in gid_set: continue
+            tile = self._get_tile_by_gid(gid)
+            if tile is None: continue
+            if class_ is not None and tile.class_ != class_: continue
+            if property is not None:
+                found = (tile.properties or {}).get(property)
+                if (not found) if value is None else (found != value): continue
+            matched[index] = True
+        return matched[inverse].reshape(grid.shape)
+    
+    def set_tile(self, layer: str, col: int, row: int, gid: int) -> Optional[Any]:
+        '''
+        Change tile of a cell at runtime(i.e. destructible walls), gid 0 to clear.
+        
+        Sprite of the cell is replaced, static collision is rebuilt only for the chunk of the cell
+        if layer is world_static. Maps without chunked collision(see destructible) 
+        split whole map collision into chunks at the first static change.
+        
+        Returns new object of the cell(sprite or object of tile class), None if empty or not streamed in.
+        '''
+        info = self._get_layer_info(layer)
+        rows, cols = info.gids.shape
+        if not (0 <= row < rows and 0 <= col < cols):
+            raise IndexError(f'Cell ({col}, {row}) is out of {layer}')
+        
+        info.gids[row, col] = gid & 0x1FFFFFFF
+        info.flips[row, col] = gid >> 29
+        chunk = (col // self.chunk_size, row // self.chunk_size)
+        materialized = not self.streaming or chunk in self._loaded_chunks
+        cells = self._cell_objects[layer]
+        if (col, row) in cells: _remove_tile_object(*cells.pop((col, row)))
+        
+        obj = None
+        if gid and materialized:
+            for cell, obj, sprite in self._create_tile_objects(info.layer, info.sprite_list, [(col, row, gid)], **info.options):
+                cells[cell] = (obj, sprite)
+        
+        if info.world_static:
+            if not self._chunked_collision:
+                self._update_all_chunk_collision()
+            else:
+                self._chunk_collision.pop(chunk, None)
+                if materialized: self._update_chunk_collision(chunk)
+        return obj
+    
     def setup(self):
         
         if not self.map: return False
@@ -852,12 +1688,12 @@ class TiledMap:
         #WIP
         
         # print('sys.modules',sys.modules[__name__])
-        class_ = get_class_loaded(class_name)
+        class_, _ = self._get_tile_class(class_name)
         # return class_
         # return class_(*args, **kwds)
         
     def tick(self, delta_time:float):
-        pass
+        if self.streaming: self.update_streaming()
     
     def draw(self):
         if self.camera:
@@ -866,5 +1702,43 @@ class TiledMap:
             layer.draw()
 
 
+def compile_map(
+    filepath:Union[str, Path],
+    scale:float = 1.0,
+    hit_box_algorithm:str = "Simple",
+    hit_box_detail:float = 4.5,
+    offset:Vector = vectors.zero,
+    layer_options: Optional[Dict[str, Dict[str, Any]]] = None,
+    workers:int = 0,
+    collision_mode:str = 'merge',
+) -> str:
+    '''
+    Compile Tiled JSON map to binary map file(.tmc) next to it.
+    TiledMap.load_map() uses the compiled one while it is newer than the json.
+    
+    Static collision is precomputed with given options, 
+    used only if TiledMap loading the map has the same options.
+    Static collision is built with all cores by default(workers).
+    Returns path of compiled map.
+    '''
+    map_path = Path(get_path(str(filepath)))
+    raw_map = load_json(map_path)
+    tiled_map = pytiled_parser.parse_map(map_path)
+    world = TiledMap(scale=scale, 
+                     hit_box_algorithm=hit_box_algorithm, 
+                     hit_box_detail=hit_box_detail, 
+                     offset=offset, 
+                     space=PhysicsSpace(),
+                     workers=workers,
+                     collision_mode=collision_mode)
+    world.load_map(filepath, layer_options=layer_options, tiled_map=tiled_map)
+    return write_compiled_map(
+        filepath, raw_map, tiled_map,
+        map_hash = world.map_hash,
+        static_collision = world.map_static_collision,
+        options = world._get_collision_options(layer_options),
+    )
+
+
 if __name__ != "__main__":
     print("include", __name__, ":", __file__)
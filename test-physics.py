@@ -80,7 +80,7 @@ class PhysicsTestView(View):
     def __init__(self, window: Window = None):
         super().__init__(window)
         
-        self.space = PhysicsSpace()
+        self.space = PhysicsSpace(fixed_step = 1 / DEFAULT_FPS, interpolate = True)
         
         self.field_layer = ObjectLayer()
         self.wall_layer = ObjectLayer(self.space)
@@ -238,6 +238,11 @@ class PhysicsTestView(View):
         
         ### Pretty case for dealing with collision handler
         # collision_handler(collision.character, collision.debris)
+
+        ### Deferred case, handler gets list of CollisionEvent after space.tick() stepped
+        # self.space.add_collision_handler(collision.character, collision.debris,
+        #                                  post_handler=lambda events: print(len(events), 'hits'),
+        #                                  deferred=True, dedupe=True)
         
         # self.space.add_collision_handler(collision.character, collision.wall, 
         #                                           begin_handler=begin_player_hit_wall, 
@@ -537,7 +542,7 @@ class PhysicsTestView(View):
         GAME.debug_text.perf_check('update_physics')
 
         # self.space.step(delta_time)
-        self.space.tick(1/60, sync = False)
+        self.space.tick(delta_time, sync = False)
         
         if CONFIG.debug_f_keys[3]:
             grounding = self.player.body.physics.get_grounding()
@@ -609,7 +614,7 @@ class WorldTestView(View):
         
     def setup(self):
         
-        self.space = PhysicsSpace()     ### For control physics from view.
+        self.space = PhysicsSpace(fixed_step = 1 / DEFAULT_FPS, interpolate = True)     ### For control physics from view.
         self.player_layer = ObjectLayer(self.space)
         self.player = EscapePlayer()
         sp = Spawner(
@@ -652,7 +657,7 @@ class WorldTestView(View):
         GAME.debug_text['GAMEOBJECT SPAWN/DESTROYED/GC'] = f'{GameObject.spawn_counter - GameObject.destroy_counter}/{GameObject.destroy_counter - GameObject.gc_counter}/{GameObject.gc_counter}'
         
         self.world.tick(delta_time)     ### includes player, physics update
-        self.space.tick(1/60)
+        self.space.tick(delta_time)
         
     def on_draw(self):
         GAME.debug_text.perf_check('DRAW')